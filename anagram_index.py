@@ -0,0 +1,222 @@
+"""Anagram and sub-word lookups keyed by sorted-letter signatures.
+
+Each word's signature is its accent-folded letters in sorted order, e.g.
+"amor" -> "amor", "roma" -> "amor". Signatures are persisted in the
+anagram_index side table (indexed on signature) so the index is ready at
+startup, and loaded into a trie over the signature letters for sub-word
+queries. anagram_index_state holds one row stamped when the table was
+built; triggers on words delete it whenever a word is inserted, deleted or
+renamed, so a missing row means "stale" and the next read rebuilds the
+table. A rack query walks only the trie branches whose letters the rack
+can still pay for, so its cost follows the number of matching signatures
+rather than the vocabulary size.
+"""
+
+import argparse
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone
+
+from normalize_words import normalize_word
+
+ANAGRAMS_SQL = """
+    SELECT word FROM anagram_index WHERE signature = ? AND word <> ?
+    ORDER BY word
+    """
+
+
+def signature(word):
+    return "".join(sorted(normalize_word(word)))
+
+
+def build_anagram_table(conn):
+    """(Re)build the anagram_index table from words in one statement.
+
+    Returns the number of words indexed.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS anagram_index (
+            word TEXT PRIMARY KEY,
+            signature TEXT NOT NULL,
+            FOREIGN KEY (word) REFERENCES words(word)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_anagram_signature ON anagram_index(signature)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS anagram_index_state (built TEXT NOT NULL)")
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS anagram_index_insert AFTER INSERT ON words BEGIN
+            DELETE FROM anagram_index_state;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS anagram_index_delete AFTER DELETE ON words BEGIN
+            DELETE FROM anagram_index_state;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS anagram_index_update
+        AFTER UPDATE OF word ON words BEGIN
+            DELETE FROM anagram_index_state;
+        END
+        """
+    )
+    conn.create_function("signature", 1, signature, deterministic=True)
+    conn.execute("DELETE FROM anagram_index")
+    cursor = conn.execute(
+        "INSERT INTO anagram_index (word, signature) SELECT word, signature(word) FROM words"
+    )
+    conn.execute("DELETE FROM anagram_index_state")
+    conn.execute(
+        "INSERT INTO anagram_index_state (built) VALUES (?)",
+        (datetime.now(timezone.utc).isoformat(timespec="seconds"),),
+    )
+    return cursor.rowcount
+
+
+def has_anagram_table(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'anagram_index'"
+    ).fetchone()
+    return row is not None
+
+
+def is_stale(conn):
+    """Return True if anagram_index is missing or words changed since it was built."""
+    tables = {
+        name
+        for (name,) in conn.execute(
+            """
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name IN ('anagram_index', 'anagram_index_state')
+            """
+        )
+    }
+    if len(tables) < 2:
+        return True
+    return conn.execute("SELECT 1 FROM anagram_index_state").fetchone() is None
+
+
+def refresh_anagram_table(conn, rebuild=False):
+    """Rebuild and commit anagram_index if it is stale (always with rebuild).
+
+    Returns the number of words indexed, or None if the table was current.
+    """
+    if not rebuild and not is_stale(conn):
+        return None
+    count = build_anagram_table(conn)
+    conn.commit()
+    return count
+
+
+def anagrams(conn, word, refresh=True):
+    """Return other words with the same letters as word, using the table index.
+
+    With refresh, a stale table is rebuilt first.
+    """
+    if refresh:
+        refresh_anagram_table(conn)
+    cursor = conn.execute(ANAGRAMS_SQL, (signature(word), word))
+    return [row[0] for row in cursor]
+
+
+class _Node:
+    __slots__ = ("children", "words")
+
+    def __init__(self):
+        self.children = {}
+        self.words = None
+
+
+class AnagramIndex:
+    """In-memory signature trie loaded from the anagram_index table."""
+
+    def __init__(self, rows=()):
+        self.root = _Node()
+        self.by_signature = {}
+        for word, word_signature in rows:
+            self.add(word, word_signature)
+
+    @classmethod
+    def from_database(cls, conn, rebuild=False):
+        """Load the index, rebuilding the side table first if it is stale."""
+        refresh_anagram_table(conn, rebuild)
+        return cls(conn.execute("SELECT word, signature FROM anagram_index"))
+
+    def add(self, word, word_signature=None):
+        word_signature = word_signature or signature(word)
+        words = self.by_signature.get(word_signature)
+        if words is None:
+            node = self.root
+            for letter in word_signature:
+                child = node.children.get(letter)
+                if child is None:
+                    child = node.children[letter] = _Node()
+                node = child
+            words = node.words = self.by_signature[word_signature] = []
+        words.append(word)
+
+    def anagrams(self, word):
+        """Return all words (including word itself, if known) with its letters."""
+        return sorted(self.by_signature.get(signature(word), ()))
+
+    def sub_words(self, rack, min_length=1):
+        """Return all words that can be formed from the letters in rack."""
+        counts = Counter(normalize_word(rack))
+        results = []
+
+        # Children of a node only use letters sorted at or after its own, so
+        # every multiset of rack letters is visited at most once
+        def walk(node, depth):
+            if node.words is not None and depth >= min_length:
+                results.extend(node.words)
+            for letter, child in node.children.items():
+                if counts[letter] > 0:
+                    counts[letter] -= 1
+                    walk(child, depth + 1)
+                    counts[letter] += 1
+
+        walk(self.root, 0)
+        return sorted(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the anagram_index table and query anagrams or sub-words."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild the anagram_index table"
+    )
+    parser.add_argument("--anagrams", metavar="WORD", help="List anagrams of WORD")
+    parser.add_argument(
+        "--rack", metavar="LETTERS", help="List words formed from LETTERS"
+    )
+    parser.add_argument(
+        "--min-length", type=int, default=2, help="Shortest sub-word to list"
+    )
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db or os.path.join("es_data", "es.db"))
+    try:
+        count = refresh_anagram_table(conn, args.rebuild)
+        if count is not None:
+            print(f"Indexed {count} words in anagram_index")
+        if args.anagrams:
+            words = anagrams(conn, args.anagrams, refresh=False)
+            print(", ".join(words) or "No anagrams found")
+        if args.rack:
+            index = AnagramIndex.from_database(conn)
+            words = index.sub_words(args.rack, args.min_length)
+            print(", ".join(words) or "No words found")
+    finally:
+        conn.close()
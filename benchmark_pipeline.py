@@ -0,0 +1,253 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from createEsWordDB import create_database
+from extract_words import export_words
+from import_ivan_words import import_words
+from import_word_frequencies import import_word_frequencies
+from update_word_levels import update_word_levels
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+""" example of usage
+python benchmark_pipeline.py run --sizes 10000 100000 --output bench.json
+python benchmark_pipeline.py compare baseline.json bench.json --threshold 0.1
+"""
+
+DEFAULT_SIZES = [10000, 100000]
+ONSETS = [""] + "b c d f g l m n p r s t v ch ll br tr pl gr ñ qu j z".split()
+VOWELS = ["a", "e", "i", "o", "u", "á", "é", "í", "ó", "ú", "ia", "ue", "io"]
+CODAS = ["", "", "", "n", "s", "r", "l"]
+
+
+def synthetic_word(rng):
+    syllables = rng.choice((1, 2, 2, 3, 3, 4))
+    word = "".join(
+        rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+        for _ in range(syllables)
+    )
+    return word[:15]
+
+
+def generate_vocabulary(size, seed=0):
+    """Return size unique Spanish-like words, deterministic for a given seed."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(synthetic_word(rng))
+    return sorted(words)
+
+
+def write_inputs(words, directory, seed=0):
+    """Write the word, level and frequency files the pipeline stages read."""
+    rng = random.Random(seed)
+    paths = {
+        "words": os.path.join(directory, "words.csv"),
+        "levels": os.path.join(directory, "levels.csv"),
+        "frequencies": os.path.join(directory, "frequencies.txt"),
+    }
+    with open(paths["words"], "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["word", "translation", "length"])
+        for word in words:
+            writer.writerow([word, f"translation of {word}", len(word)])
+    with open(paths["levels"], "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["word", "level"])
+        for word in words:
+            writer.writerow([word, rng.randint(1, 10)])
+    with open(paths["frequencies"], "w", encoding="utf-8") as f:
+        f.write("# synthetic word frequencies\n")
+        # Zipf-like counts, plus as many words again that are not in the table
+        for rank, word in enumerate(rng.sample(words, len(words)), start=1):
+            f.write(f"{word} {1000000 // rank + 1}\n")
+            f.write(f"{word}x {1000000 // rank + 1}\n")
+    return paths
+
+
+def create_benchmark_database(db_path):
+    create_database(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO sources (short_name, description) VALUES ('self', 'benchmark')"
+    )
+    conn.commit()
+    conn.close()
+
+
+def stage_runners(paths, db_path, output_dir):
+    """Return {stage: runner}; each runner returns the number of rows it wrote."""
+    return {
+        "import": lambda: import_words(
+            paths["words"],
+            db_path,
+            "self",
+            rejects_path=os.path.join(output_dir, "rejected.csv"),
+        )[0],
+        "update_levels": lambda: update_word_levels(
+            db_path, paths["levels"], "benchmark"
+        )["updated"],
+        "frequencies": lambda: import_word_frequencies(paths["frequencies"], db_path),
+        "export": lambda: export_words(
+            "es",
+            lengths=None,
+            db_path=db_path,
+            output_path=os.path.join(output_dir, "words.json"),
+        ),
+    }
+
+
+def _run_stage(stage, paths, db_path, output_dir):
+    """Run one stage in a child process so its peak RSS is its own.
+
+    Returns (seconds, rows, peak RSS in KB or None).
+    """
+    runner = stage_runners(paths, db_path, output_dir)[stage]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = runner()
+    elapsed = time.perf_counter() - start
+    peak_rss_kb = None
+    if resource is not None:
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak_rss_kb //= 1024
+    return elapsed, rows, peak_rss_kb
+
+
+def run_benchmarks(sizes=None, output_path="bench_output.json", seed=0):
+    sizes = sizes or DEFAULT_SIZES
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for size in sizes:
+        words = generate_vocabulary(size, seed)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_inputs(words, directory, seed)
+            db_path = os.path.join(directory, "bench.db")
+            create_benchmark_database(db_path)
+
+            for stage in stage_runners(paths, db_path, directory):
+                # A fresh spawned process per stage: a forked child would
+                # start with the parent's vocabulary already in its RSS, and
+                # an exception or crash in the stage is raised here
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    future = pool.submit(_run_stage, stage, paths, db_path, directory)
+                    try:
+                        elapsed, rows, peak_rss_kb = future.result()
+                    except Exception as e:
+                        raise RuntimeError(
+                            f"Stage {stage} failed for {size} words: {e}"
+                        ) from e
+
+                runs.append(
+                    {
+                        "size": size,
+                        "stage": stage,
+                        "seconds": round(elapsed, 4),
+                        "rows": rows,
+                        "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+                        "peak_rss_kb": peak_rss_kb,
+                    }
+                )
+                print(
+                    f"{size:>9} words  {stage:<14} {elapsed:8.3f}s  "
+                    f"{rows:>9} rows  "
+                    f"{rows / elapsed if elapsed else 0:>12,.0f} rows/sec  "
+                    f"peak RSS {peak_rss_kb or '?'} KB"
+                )
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "seed": seed,
+        "runs": runs,
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Benchmark results written to {output_path}")
+    return report
+
+
+def compare_results(baseline_path, current_path, threshold=0.1):
+    """Print per-stage changes and return the number of regressions.
+
+    A stage regresses when it is slower than the baseline by more than
+    threshold (0.1 = 10%).
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["size"], r["stage"]): r for r in json.load(f)["runs"]}
+    with open(current_path, "r", encoding="utf-8") as f:
+        current = {(r["size"], r["stage"]): r for r in json.load(f)["runs"]}
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        before = baseline[key]["seconds"]
+        after = current[key]["seconds"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(
+            f"{key[0]:>9} words  {key[1]:<14} {before:8.3f}s -> {after:8.3f}s "
+            f"({change:+.1%}){flag}"
+        )
+
+    for key in sorted(baseline.keys() ^ current.keys()):
+        print(f"{key[0]:>9} words  {key[1]:<14} only in one result file")
+
+    print(f"{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the import, update and export pipeline stages."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Vocabulary sizes to benchmark",
+    )
+    run_parser.add_argument(
+        "--output", default="bench_output.json", help="Results file"
+    )
+    run_parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline", help="Baseline results file")
+    compare_parser.add_argument("current", help="Results file to check")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown before a stage counts as a regression",
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run_benchmarks(args.sizes, args.output, args.seed)
+    elif compare_results(args.baseline, args.current, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from createEsWordDB import create_database
+from import_word_frequencies import import_word_frequencies
+from merge_sources import merge_sources
+from update_word_levels import update_word_levels
+
+""" example manifest
+{
+    "languages": [
+        {
+            "language_name": "español",
+            "english_name": "Spanish",
+            "language_code": "es",
+            "sources": [
+                {"short_name": "ivan", "description": "Spanish-English dictionary"}
+            ],
+            "word_files": [{"csv": "es_data/es_en_5.csv", "source": "ivan"}],
+            "source_priority": ["self", "ivan"],
+            "level_files": ["es_data/es_5_levels.csv"],
+            "frequency_file": "es_data/es-word-frequencies.txt"
+        }
+    ]
+}
+
+Relative paths are resolved against the manifest's directory. The database
+is written to <code>_data/<code>.db unless "db_path" is given. Word files
+are merged by merge_sources.py; "source_priority" (most trusted first)
+defaults to the order of word_files.
+"""
+
+REQUIRED_KEYS = ("language_name", "english_name", "language_code")
+
+
+def load_manifest(manifest_path):
+    """Read the manifest and resolve relative paths against its directory."""
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    def resolve(path):
+        return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+    languages = []
+    for language in manifest["languages"]:
+        missing = [key for key in REQUIRED_KEYS if key not in language]
+        if missing:
+            raise ValueError(
+                f"Manifest entry {language} is missing {', '.join(missing)}"
+            )
+        code = language["language_code"]
+        language = dict(language)
+        language["db_path"] = resolve(
+            language.get("db_path", os.path.join(f"{code}_data", f"{code}.db"))
+        )
+        language["word_files"] = [
+            dict(entry, csv=resolve(entry["csv"]))
+            for entry in language.get("word_files", [])
+        ]
+        language["level_files"] = [
+            resolve(path) for path in language.get("level_files", [])
+        ]
+        if language.get("frequency_file"):
+            language["frequency_file"] = resolve(language["frequency_file"])
+        languages.append(language)
+    return languages
+
+
+def build_language(language):
+    """Build one language database into a temp file and rename it into place.
+
+    Runs in a worker process. Returns (language_code, seconds).
+    """
+    start = time.perf_counter()
+    db_path = language["db_path"]
+    temp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    try:
+        create_database(
+            temp_path,
+            language["language_name"],
+            language["english_name"],
+            language["language_code"],
+        )
+
+        conn = sqlite3.connect(temp_path)
+        conn.executemany(
+            "INSERT INTO sources (short_name, description) VALUES (?, ?)",
+            [
+                (source["short_name"], source.get("description"))
+                for source in language.get("sources", [])
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        if language["word_files"]:
+            merge_sources(
+                [
+                    (entry.get("source", "self"), entry["csv"])
+                    for entry in language["word_files"]
+                ],
+                temp_path,
+                language.get("source_priority"),
+                # Languages built in parallel may share CSV names
+                rejects_suffix=f".{language['language_code']}.rejected.csv",
+            )
+        for level_file in language["level_files"]:
+            update_word_levels(temp_path, level_file, "build_languages")
+        if language.get("frequency_file"):
+            import_word_frequencies(
+                language["frequency_file"],
+                temp_path,
+                language.get("log_frequency", False),
+            )
+
+        os.replace(temp_path, db_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return language["language_code"], time.perf_counter() - start
+
+
+def build_languages(manifest_path, languages=None, workers=None):
+    entries = load_manifest(manifest_path)
+    if languages:
+        entries = [entry for entry in entries if entry["language_code"] in languages]
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(build_language, entry): entry["language_code"]
+            for entry in entries
+        }
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                _, elapsed = future.result()
+                print(f"Built {code} in {elapsed:.2f}s")
+            except Exception as e:
+                failures += 1
+                print(f"Error building {code}: {e}")
+
+    print(f"Finished building {len(entries) - failures} of {len(entries)} languages")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build language databases from a manifest in parallel."
+    )
+    parser.add_argument("manifest", help="JSON manifest of languages to build")
+    parser.add_argument(
+        "--languages", nargs="*", help="Only build these language codes"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Number of worker processes (default: CPU count)"
+    )
+    args = parser.parse_args()
+
+    if build_languages(args.manifest, args.languages, args.workers):
+        sys.exit(1)
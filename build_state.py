@@ -0,0 +1,140 @@
+"""Content hashes of ingested input files, stored in the language database.
+
+build_state keeps one row per (stage, input file) with the hash and row count
+of the version last applied, so a rerun can skip a file that has not changed.
+Stages whose result also depends on which words exist (levels, frequencies)
+store a words-table generation with it and are rerun when that changes.
+build_rows keeps a hash per keyed row (e.g. per word) of the rows that were
+actually applied, so that when a CSV does change, or a row could not be
+applied before, only those rows are applied.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+
+HASH_BLOCK_SIZE = 1 << 20
+
+# Keeps IN (...) lists, plus the file name, under the 999 bound parameter
+# limit of SQLite before 3.32
+KEY_BATCH_SIZE = 900
+
+
+def ensure_build_state(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS build_state (
+            file_name TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            updated TEXT NOT NULL,
+            words_generation TEXT
+        )
+        """
+    )
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(build_state)")}
+    if "words_generation" not in columns:
+        conn.execute("ALTER TABLE build_state ADD COLUMN words_generation TEXT")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS build_rows (
+            file_name TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            row_hash TEXT NOT NULL,
+            PRIMARY KEY (file_name, row_key)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def state_key(stage, path):
+    """Key the state of one input file for one pipeline stage."""
+    return f"{stage}:{os.path.abspath(path)}"
+
+
+def words_generation(conn):
+    """Return a value that changes whenever words are inserted or deleted."""
+    count, max_id = conn.execute("SELECT COUNT(*), MAX(word_id) FROM words").fetchone()
+    return f"{count}:{max_id or 0}"
+
+
+def file_hash(path):
+    """Return the SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_hash(values):
+    return hashlib.sha1("\x1f".join(str(v) for v in values).encode("utf-8")).hexdigest()
+
+
+def is_unchanged(conn, stage, path, content_hash, generation=None):
+    """Return True if path was last applied with the same content hash.
+
+    With generation (see words_generation), the words table must also be
+    unchanged since then.
+    """
+    ensure_build_state(conn)
+    row = conn.execute(
+        "SELECT content_hash, words_generation FROM build_state WHERE file_name = ?",
+        (state_key(stage, path),),
+    ).fetchone()
+    return row is not None and row == (content_hash, generation)
+
+
+def changed_keys(conn, stage, path, hashed_rows):
+    """Return the keys from (key, hash) pairs that are new or have a new hash."""
+    hashed_rows = list(hashed_rows)
+    stored = {}
+    for i in range(0, len(hashed_rows), KEY_BATCH_SIZE):
+        keys = [key for key, _ in hashed_rows[i : i + KEY_BATCH_SIZE]]
+        placeholders = ",".join("?" * len(keys))
+        stored.update(
+            conn.execute(
+                f"""
+                SELECT row_key, row_hash FROM build_rows
+                WHERE file_name = ? AND row_key IN ({placeholders})
+                """,
+                [state_key(stage, path)] + keys,
+            )
+        )
+    return {key for key, digest in hashed_rows if stored.get(key) != digest}
+
+
+def record_rows(conn, stage, path, hashed_rows):
+    """Store (key, hash) pairs of applied rows for path, replacing earlier hashes."""
+    name = state_key(stage, path)
+    conn.executemany(
+        """
+        INSERT INTO build_rows (file_name, row_key, row_hash) VALUES (?, ?, ?)
+        ON CONFLICT (file_name, row_key) DO UPDATE SET row_hash = excluded.row_hash
+        """,
+        [(name, key, digest) for key, digest in hashed_rows],
+    )
+
+
+def record_file(conn, stage, path, content_hash, row_count, generation=None):
+    """Record that path has been applied with the given hash and row count."""
+    ensure_build_state(conn)
+    conn.execute(
+        """
+        INSERT INTO build_state
+            (file_name, content_hash, row_count, updated, words_generation)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (file_name) DO UPDATE SET
+            content_hash = excluded.content_hash,
+            row_count = excluded.row_count,
+            updated = excluded.updated,
+            words_generation = excluded.words_generation
+        """,
+        (
+            state_key(stage, path),
+            content_hash,
+            row_count,
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            generation,
+        ),
+    )
@@ -1,15 +1,25 @@
+import argparse
 import os
 import sqlite3
 import sys
 
+import pipeline_stats
+from letter_stats import ensure_letter_stats
+from migrate_schema import READ_INDEX, SCHEMA_VERSION, set_schema_version
+from translation_search import ensure_translation_index
 
-def create_database(db_path):
+
+def create_database(
+    db_path, language_name="español", english_name="Spanish", language_code="es"
+):
     """Create a new SQLite database with the required tables."""
     # Ensure the directory exists
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
+    stats = pipeline_stats.get()
+
     # Connect to database (this will create it if it doesn't exist)
-    conn = sqlite3.connect(db_path)
+    conn = stats.track(sqlite3.connect(db_path))
     cursor = conn.cursor()
 
     # Create language_info table
@@ -18,7 +28,8 @@ def create_database(db_path):
     CREATE TABLE language_info (
         language_name TEXT NOT NULL,
         english_name TEXT NOT NULL,
-        language_code TEXT NOT NULL
+        language_code TEXT NOT NULL,
+        fold_enye INTEGER NOT NULL DEFAULT 0
     )
     """
     )
@@ -31,7 +42,8 @@ def create_database(db_path):
         short_name TEXT NOT NULL UNIQUE,
         description TEXT
         CHECK (length(short_name) = 4)
-        CHECK (length(description) <= 120)
+        CHECK (length(description) <= 120),
+        priority INTEGER
     )
     """
     )
@@ -42,6 +54,8 @@ def create_database(db_path):
     CREATE TABLE words (
         word_id INTEGER PRIMARY KEY AUTOINCREMENT,
         word TEXT NOT NULL UNIQUE,
+        normalized_word TEXT,
+        lemma TEXT,
         length INTEGER NOT NULL,
         en_translation TEXT,
         frequency REAL,
@@ -58,6 +72,19 @@ def create_database(db_path):
     """
     )
 
+    # Create word_sources table to link each word to every source it came from
+    cursor.execute(
+        """
+    CREATE TABLE word_sources (
+        word_id INTEGER NOT NULL,
+        source_id INTEGER NOT NULL,
+        PRIMARY KEY (word_id, source_id),
+        FOREIGN KEY (word_id) REFERENCES words(word_id),
+        FOREIGN KEY (source_id) REFERENCES sources(source_id)
+    ) WITHOUT ROWID
+    """
+    )
+
     # Create edits table
     cursor.execute(
         """
@@ -75,22 +102,40 @@ def create_database(db_path):
     # Create indexes
     cursor.execute("CREATE INDEX idx_length ON words(length)")
     cursor.execute("CREATE INDEX idx_level ON words(level)")
+    cursor.execute("CREATE INDEX idx_normalized_word ON words(normalized_word)")
+    cursor.execute("CREATE INDEX idx_lemma ON words(lemma)")
+    cursor.execute(READ_INDEX)
+
+    # Full-text index over en_translation, kept in sync by triggers
+    ensure_translation_index(conn)
+
+    # Cached letter statistics, invalidated per length by triggers on words
+    ensure_letter_stats(conn)
 
-    # Insert Spanish language info
+    # Insert language info
     cursor.execute(
         """
     INSERT INTO language_info (language_name, english_name, language_code)
     VALUES (?, ?, ?)
     """,
-        ("español", "Spanish", "es"),
+        (language_name, english_name, language_code),
     )
 
+    # The schema above already includes every migration
+    set_schema_version(conn, SCHEMA_VERSION)
+
     # Commit changes and close connection
-    conn.commit()
+    with stats.stage("commit"):
+        conn.commit()
     conn.close()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Create the Spanish word database.")
+    pipeline_stats.add_arguments(parser)
+    args = parser.parse_args()
+    stats = pipeline_stats.configure("createEsWordDB", args.stats, args.profile)
+
     # Define database path and ensure parent directory exists
     db_dir = "es_data"
     os.makedirs(db_dir, exist_ok=True)
@@ -99,14 +144,18 @@ def main():
     # Check if database already exists
     if os.path.exists(db_path):
         print(f"Error: Database already exists at {db_path}")
+        print("Use migrate_schema.py to upgrade an existing database in place")
         sys.exit(1)
 
     try:
-        create_database(db_path)
+        with stats.stage("create_database"):
+            create_database(db_path)
         print(f"Successfully created database at {db_path}")
     except sqlite3.Error as e:
         print(f"Error creating database: {e}")
         sys.exit(1)
+    finally:
+        pipeline_stats.finish()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,348 @@
+"""Fill in missing English translations through a pluggable translator.
+
+Words whose en_translation is empty are sent to a Translator in batches,
+several batches at a time, with a shared rate limit and retries with
+exponential backoff for failed batches. Every answer, including "no
+translation found", is stored in an on-disk cache (a small SQLite file), so
+a rerun only asks the translator about words it has never seen. Found
+translations are applied with one joined UPDATE and recorded in the edits
+table.
+
+DictionaryTranslator answers from a local CSV (word, translation) or JSON
+file and stands in for a remote service when testing. Other backends
+subclass Translator and can be selected with --translator module:Class.
+"""
+
+import abc
+import argparse
+import asyncio
+import csv
+import getpass
+import importlib
+import json
+import os
+import sqlite3
+import time
+
+from import_ivan_words import MAX_TRANSLATION_LENGTH
+from update_word_levels import edit_date
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 10.0
+DEFAULT_RETRIES = 3
+
+
+class Translator(abc.ABC):
+    """Translates batches of words; subclasses implement translate()."""
+
+    batch_size = DEFAULT_BATCH_SIZE
+
+    @abc.abstractmethod
+    async def translate(self, words, language_code):
+        """Return {word: translation or None} for a list of words.
+
+        Any exception fails the batch, which is then retried.
+        """
+
+    async def close(self):
+        pass
+
+
+class DictionaryTranslator(Translator):
+    """Looks words up in a local CSV (word, translation columns) or JSON object."""
+
+    def __init__(self, path):
+        if path.endswith(".json"):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        else:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                self.entries = {
+                    row["word"].strip(): row["translation"].strip()
+                    for row in csv.DictReader(f)
+                }
+
+    async def translate(self, words, language_code):
+        return {word: self.entries.get(word) or None for word in words}
+
+
+def load_translator(spec):
+    """Create a Translator from "module:Class" (constructed without arguments)."""
+    module_name, _, class_name = spec.partition(":")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(cls, type) and issubclass(cls, Translator)):
+        raise TypeError(f"{spec} is not a Translator subclass")
+    return cls()
+
+
+class RateLimiter:
+    """Allow at most rate requests per second across all concurrent batches."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_time = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class TranslationCache:
+    """Translator answers stored on disk, keyed by language and word."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translation_cache (
+                language_code TEXT NOT NULL,
+                word TEXT NOT NULL,
+                translation TEXT,
+                PRIMARY KEY (language_code, word)
+            ) WITHOUT ROWID
+            """
+        )
+
+    def lookup(self, language_code, words):
+        """Return {word: translation or None} for the words already cached."""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (word TEXT)")
+        self.conn.execute("DELETE FROM wanted")
+        self.conn.executemany("INSERT INTO wanted VALUES (?)", ((w,) for w in words))
+        cursor = self.conn.execute(
+            """
+            SELECT c.word, c.translation
+            FROM wanted JOIN translation_cache c
+                ON c.language_code = ? AND c.word = wanted.word
+            """,
+            (language_code,),
+        )
+        return dict(cursor.fetchall())
+
+    def store(self, language_code, results):
+        self.conn.executemany(
+            """
+            INSERT OR REPLACE INTO translation_cache (language_code, word, translation)
+            VALUES (?, ?, ?)
+            """,
+            ((language_code, word, text) for word, text in results.items()),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def fit_translation(text):
+    """Trim a translation to the column limit, dropping whole "; " senses first."""
+    if not text:
+        return None
+    text = text.strip()
+    while len(text) > MAX_TRANSLATION_LENGTH and "; " in text:
+        text = text.rsplit("; ", 1)[0]
+    return text[:MAX_TRANSLATION_LENGTH]
+
+
+async def translate_batch(translator, batch, language_code, limiter, retries):
+    """Translate one batch, retrying failures with exponential backoff."""
+    for attempt in range(retries + 1):
+        await limiter.wait()
+        try:
+            return await translator.translate(batch, language_code)
+        except Exception as e:
+            if attempt == retries:
+                print(f"Batch starting at '{batch[0]}' failed: {e}")
+                return {}
+            await asyncio.sleep(0.5 * 2**attempt)
+
+
+async def translate_words(
+    translator,
+    words,
+    language_code,
+    cache,
+    concurrency=DEFAULT_CONCURRENCY,
+    rate=DEFAULT_RATE,
+    retries=DEFAULT_RETRIES,
+):
+    """Return ({word: translation or None}, number of words requested).
+
+    Cached words are answered from the cache; the rest are sent to the
+    translator and their answers are cached as each batch completes.
+    """
+    results = cache.lookup(language_code, words)
+    pending = [word for word in words if word not in results]
+    size = translator.batch_size
+    batches = [pending[i : i + size] for i in range(0, len(pending), size)]
+
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(batch):
+        async with semaphore:
+            answers = await translate_batch(
+                translator, batch, language_code, limiter, retries
+            )
+        # Words the backend did not answer at all are left out of the cache
+        # so the next run asks again
+        answers = {word: fit_translation(answers[word]) for word in answers}
+        cache.store(language_code, answers)
+        results.update(answers)
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+    return results, len(pending)
+
+
+def missing_translations(conn):
+    cursor = conn.execute(
+        """
+        SELECT word FROM words
+        WHERE en_translation IS NULL OR TRIM(en_translation) = ''
+        ORDER BY word_id
+        """
+    )
+    return [word for (word,) in cursor]
+
+
+def apply_translations(conn, translations, author):
+    """Write found translations with one UPDATE; returns the rows updated."""
+    conn.execute(
+        """
+        CREATE TEMP TABLE new_translations (
+            word TEXT PRIMARY KEY,
+            en_translation TEXT NOT NULL
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO new_translations (word, en_translation) VALUES (?, ?)",
+        translations.items(),
+    )
+    conn.execute(
+        """
+        INSERT INTO edits (date, word, change_description, author)
+        SELECT ?, word, 'translation added: ' || en_translation, ?
+        FROM new_translations
+        """,
+        (edit_date(), author),
+    )
+    cursor = conn.execute(
+        """
+        UPDATE words
+        SET en_translation = n.en_translation
+        FROM new_translations n
+        WHERE words.word = n.word
+        """
+    )
+    return cursor.rowcount
+
+
+def enrich_translations(
+    translator,
+    db_path=None,
+    cache_path=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    rate=DEFAULT_RATE,
+    retries=DEFAULT_RETRIES,
+    author=None,
+):
+    db_path = db_path or os.path.join("es_data", "es.db")
+    author = author or getpass.getuser()
+    start = time.perf_counter()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        (language_code,) = conn.execute(
+            "SELECT language_code FROM language_info"
+        ).fetchone()
+        cache_path = cache_path or os.path.join(
+            os.path.dirname(db_path), "translation_cache.db"
+        )
+        words = missing_translations(conn)
+
+        cache = TranslationCache(cache_path)
+        try:
+            results, requested = asyncio.run(
+                _translate_and_close(
+                    translator, words, language_code, cache, concurrency, rate, retries
+                )
+            )
+        finally:
+            cache.close()
+
+        found = {word: results[word] for word in words if results.get(word)}
+        updated = apply_translations(conn, found, author)
+        conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(words)} words without a translation: {requested} sent to the "
+        f"translator, {len(words) - requested} answered from the cache, "
+        f"{updated} updated in {elapsed:.2f}s"
+    )
+    return updated
+
+
+async def _translate_and_close(translator, *args):
+    try:
+        return await translate_words(translator, *args)
+    finally:
+        await translator.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fill in missing translations in batches through a translator."
+    )
+    backend = parser.add_mutually_exclusive_group(required=True)
+    backend.add_argument(
+        "--dictionary", help="Local CSV (word, translation) or JSON dictionary"
+    )
+    backend.add_argument(
+        "--translator", help="Translator class to use, as module:Class"
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--cache", help="Translation cache file (default: next to the database)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Batches in flight at once",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help="Maximum translator requests per second",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="Retries per failed batch",
+    )
+    parser.add_argument("--author", help="Author recorded in edits")
+    args = parser.parse_args()
+
+    if args.dictionary:
+        translator = DictionaryTranslator(args.dictionary)
+    else:
+        translator = load_translator(args.translator)
+    enrich_translations(
+        translator,
+        args.db,
+        args.cache,
+        args.concurrency,
+        args.rate,
+        args.retries,
+        args.author,
+    )
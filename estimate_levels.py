@@ -0,0 +1,160 @@
+import argparse
+import math
+import os
+import sqlite3
+from collections import Counter
+
+from import_word_frequencies import load_counts
+from letter_stats import letter_totals
+from normalize_words import normalize_word
+from update_word_levels import edit_date
+
+# How much each feature contributes to a word's difficulty score
+FREQUENCY_WEIGHT = 0.6
+LETTER_RARITY_WEIGHT = 0.25
+REPEATED_LETTER_WEIGHT = 0.1
+ACCENT_WEIGHT = 0.05
+
+MAX_LEVEL = 10
+
+
+def letter_probabilities(words=None, counts=None):
+    """Return the share of each accent-folded letter over all words.
+
+    Pass precomputed letter counts (see letter_stats.py) to skip counting.
+    """
+    if counts is None:
+        counts = Counter()
+        for word in words:
+            counts.update(normalize_word(word))
+    total = sum(counts.values())
+    return {letter: count / total for letter, count in counts.items()}
+
+
+def difficulty_scores(rows, max_count, letter_counts=None):
+    """Score (word, count) rows in one pass; higher scores are harder words.
+
+    count is the word's corpus count, or None if it is not in the corpus.
+    letter_counts are the letter counts over all rows, if already known.
+    """
+    words = [word for word, _ in rows]
+    probabilities = letter_probabilities(words, letter_counts)
+    surprisal = {letter: -math.log(p) for letter, p in probabilities.items()}
+    max_surprisal = max(surprisal.values(), default=1.0) or 1.0
+    log_max = math.log1p(max_count) if max_count else 1.0
+
+    scores = []
+    for word, count in rows:
+        folded = normalize_word(word)
+        rarity = sum(surprisal[c] for c in folded) / (len(folded) * max_surprisal)
+        repeated = (len(folded) - len(set(folded))) / len(folded)
+        accent = 1.0 if folded != word.lower() else 0.0
+        unfamiliar = 1.0 - math.log1p(count or 0) / log_max
+        score = FREQUENCY_WEIGHT * unfamiliar
+        score += LETTER_RARITY_WEIGHT * rarity
+        score += REPEATED_LETTER_WEIGHT * repeated
+        score += ACCENT_WEIGHT * accent
+        scores.append(score)
+    return scores
+
+
+def levels_from_scores(words, scores):
+    """Map scores to levels 1-10 by decile, so every level gets used."""
+    order = sorted(range(len(words)), key=lambda i: (scores[i], words[i]))
+    levels = [0] * len(words)
+    for rank, i in enumerate(order):
+        levels[i] = 1 + rank * MAX_LEVEL // len(words)
+    return list(zip(words, levels))
+
+
+def estimate_levels(
+    db_path=None, freq_path=None, force=False, author="estimate_levels"
+):
+    db_path = db_path or os.path.join("es_data", "es.db")
+    freq_path = freq_path or os.path.join("es_data", "es-word-frequencies.txt")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        # Stream the corpus into the word_counts temp table, then read every
+        # word with its count in one query
+        _, max_count = load_counts(conn, freq_path)
+        cursor.execute(
+            """
+            SELECT w.word, c.count
+            FROM words w
+            LEFT JOIN word_counts c ON c.word = w.word
+            ORDER BY w.word
+            """
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            print("No words found")
+            return 0
+
+        # Letter counts come from the letter_stats cache if the database has
+        # one; otherwise difficulty_scores counts them itself
+        scores = difficulty_scores(rows, max_count, letter_totals(conn))
+        levels = levels_from_scores([word for word, _ in rows], scores)
+
+        cursor.execute(
+            """
+            CREATE TEMP TABLE estimated_levels (
+                word TEXT PRIMARY KEY,
+                level INTEGER NOT NULL
+            )
+            """
+        )
+        cursor.executemany(
+            "INSERT INTO estimated_levels (word, level) VALUES (?, ?)", levels
+        )
+
+        # Hand-maintained levels are kept unless forced
+        only_unknown = "" if force else "AND words.level = 0"
+        cursor.execute(
+            f"""
+            INSERT INTO edits (date, word, change_description, author)
+            SELECT ?, words.word,
+                'level estimated as ' || e.level || ' (was ' || words.level || ')', ?
+            FROM words
+            JOIN estimated_levels e ON e.word = words.word
+            WHERE words.level <> e.level {only_unknown}
+            """,
+            (edit_date(), author),
+        )
+        cursor.execute(
+            f"""
+            UPDATE words
+            SET level = estimated_levels.level
+            FROM estimated_levels
+            WHERE words.word = estimated_levels.word
+                AND words.level <> estimated_levels.level {only_unknown}
+            """
+        )
+        updated = cursor.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+
+    scope = "all words" if force else "words at level 0"
+    print(f"Estimated levels for {len(rows)} words; updated {updated} {scope}")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Estimate word levels 1-10 from frequency and letter statistics."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument("--freq", help="Frequency list file")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Override every level, not just unknown (level 0) ones",
+    )
+    parser.add_argument(
+        "--author", default="estimate_levels", help="Author recorded in edits"
+    )
+    args = parser.parse_args()
+
+    estimate_levels(args.db, args.freq, args.force, args.author)
@@ -0,0 +1,167 @@
+import argparse
+import os
+import sqlite3
+from array import array
+
+from extract_words import parse_int_list, query_words
+from word_pack import GROUP, HEADER, MAGIC, TRANSLATION, VERSION, WordPack
+
+
+def build_groups(rows):
+    """Group (word, translation) rows by character length, sorted bytewise."""
+    groups = {}
+    for word, translation in rows:
+        groups.setdefault(len(word), []).append(
+            (word.encode("utf-8"), (translation or "").encode("utf-8"))
+        )
+    for entries in groups.values():
+        entries.sort()
+    return groups
+
+
+def align(size, boundary=4):
+    return (size + boundary - 1) // boundary * boundary
+
+
+def write_pack(path, language_code, groups):
+    """Write groups from build_groups() to path in the word-pack format."""
+    lengths = sorted(groups)
+    table_end = HEADER.size + GROUP.size * len(lengths)
+
+    # Lay out every block up front so the header can be written first
+    layout = []
+    offset = align(table_end)
+    for length in lengths:
+        entries = groups[length]
+        width = max(len(word) for word, _ in entries)
+        words_offset = offset
+        offset = align(words_offset + width * len(entries))
+        translations_offset = offset
+        offset += TRANSLATION.size * len(entries)
+        layout.append((length, width, len(entries), words_offset, translations_offset))
+    pool_offset = offset
+
+    pool = bytearray()
+    pool_index = {}
+    blocks = []
+    for length, width, count, words_offset, translations_offset in layout:
+        words = bytearray()
+        translations = array("I")
+        for word, translation in groups[length]:
+            words += word.ljust(width, b"\0")
+            # Identical translations share one copy in the pool
+            start = pool_index.get(translation)
+            if start is None:
+                start = pool_index[translation] = len(pool)
+                pool += translation
+            translations.extend((start, len(translation)))
+        if translations.itemsize != 4:
+            raise RuntimeError("array('I') must be 32-bit to write word packs")
+        blocks.append((words_offset, bytes(words)))
+        blocks.append((translations_offset, translations.tobytes()))
+
+    language = language_code.encode("ascii")[:8].ljust(8, b"\0")
+    with open(path, "wb") as f:
+        f.write(
+            HEADER.pack(MAGIC, VERSION, len(lengths), language, pool_offset, len(pool))
+        )
+        for entry in layout:
+            f.write(GROUP.pack(*entry))
+        for block_offset, data in blocks:
+            f.write(b"\0" * (block_offset - f.tell()))
+            f.write(data)
+        f.write(b"\0" * (pool_offset - f.tell()))
+        f.write(pool)
+
+
+def verify_pack(path, groups):
+    """Read the pack back and check every word and translation round-trips."""
+    with WordPack(path) as pack:
+        for length, entries in groups.items():
+            for word, translation in entries:
+                word = word.decode("utf-8")
+                if word not in pack:
+                    raise ValueError(f"Word '{word}' missing from pack")
+                if (pack.translation(word) or "") != translation.decode("utf-8"):
+                    raise ValueError(f"Translation mismatch for '{word}'")
+        if len(pack) != sum(len(entries) for entries in groups.values()):
+            raise ValueError("Word count mismatch")
+
+
+def export_word_pack(
+    language_code="es",
+    lengths=None,
+    levels=None,
+    db_path=None,
+    output_path=None,
+    verify=False,
+    lemmas_only=False,
+):
+    data_dir = f"{language_code}_data"
+    db_path = db_path or os.path.join(data_dir, f"{language_code}.db")
+    output_path = output_path or os.path.join(data_dir, f"words_{language_code}.wpk")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = query_words(conn.cursor(), lengths, levels, lemmas_only)
+        groups = build_groups((word, translation) for _, word, translation in rows)
+    finally:
+        conn.close()
+
+    if not groups:
+        print("No matching words found")
+        return 0
+
+    temp_path = output_path + ".tmp"
+    write_pack(temp_path, language_code, groups)
+    if verify:
+        try:
+            verify_pack(temp_path, groups)
+        except ValueError:
+            os.remove(temp_path)
+            raise
+    os.replace(temp_path, output_path)
+
+    count = sum(len(entries) for entries in groups.values())
+    print(
+        f"Successfully packed {count} words in {len(groups)} length groups "
+        f"to {output_path} ({os.path.getsize(output_path)} bytes)"
+    )
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export words from a language database as a binary word pack."
+    )
+    parser.add_argument(
+        "language_code",
+        nargs="?",
+        default="es",
+        help='The language code of the database (e.g., "es" for Spanish)',
+    )
+    parser.add_argument(
+        "--lengths", type=parse_int_list, help="Comma separated word lengths"
+    )
+    parser.add_argument("--levels", type=parse_int_list, help="Comma separated levels")
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument("--output", help="Output pack file")
+    parser.add_argument(
+        "--verify", action="store_true", help="Read the pack back and verify it"
+    )
+    parser.add_argument(
+        "--lemmas-only",
+        action="store_true",
+        help="Leave out inflected forms (see lemmatize_words.py)",
+    )
+    args = parser.parse_args()
+
+    export_word_pack(
+        args.language_code,
+        args.lengths,
+        args.levels,
+        args.db,
+        args.output,
+        args.verify,
+        args.lemmas_only,
+    )
@@ -1,49 +1,248 @@
+import argparse
+import contextlib
+import gzip
 import json
 import os
 import sqlite3
 
+import pipeline_stats
+
+
+def words_query(lengths=None, levels=None, lemmas_only=False):
+    """Return the (sql, params) that query_words runs."""
+    conditions = []
+    params = []
+    if lengths:
+        conditions.append(f"length IN ({','.join('?' * len(lengths))})")
+        params.extend(lengths)
+    if levels:
+        conditions.append(f"level IN ({','.join('?' * len(levels))})")
+        params.extend(levels)
+    if lemmas_only:
+        conditions.append("(lemma IS NULL OR lemma = word)")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+        SELECT length, word, en_translation
+        FROM words
+        {where}
+        ORDER BY length, word_id
+        """
+    return sql, params
+
+
+def query_words(cursor, lengths=None, levels=None, lemmas_only=False):
+    """Yield (length, word, translation) rows ordered by length.
+
+    The ORDER BY matches idx_length so rows come straight off the index
+    without a sort step. With lemmas_only, inflected forms (rows whose
+    lemma is another word) are left out.
+    """
+    cursor.execute(*words_query(lengths, levels, lemmas_only))
+    yield from cursor
+
+
+class WordGroupWriter:
+    """Write the wordGroups JSON document incrementally, one word at a time.
+
+    With indent=4 the output is identical to json.dump(..., indent=4); with
+    indent=None it is written without any whitespace.
+    """
+
+    def __init__(self, file, language_code, indent=4):
+        self.file = file
+        self.language_code = language_code
+        self.indent = indent
+        self.current_length = None
+        self.group_count = 0
+        self.word_count = 0
+
+    def _line(self, level):
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * level)
+
+    def _colon(self):
+        return ": " if self.indent is not None else ":"
+
+    def start(self):
+        colon = self._colon()
+        self.file.write(
+            "".join(
+                [
+                    "{",
+                    self._line(1),
+                    f'"languageCode"{colon}{json.dumps(self.language_code)},',
+                    self._line(1),
+                    f'"wordGroups"{colon}[',
+                ]
+            )
+        )
+
+    def _close_group(self):
+        self.file.write(self._line(3) + "]" + self._line(2) + "}")
+
+    def _open_group(self, length):
+        colon = self._colon()
+        if self.group_count:
+            self.file.write(",")
+        self.file.write(
+            "".join(
+                [
+                    self._line(2),
+                    "{",
+                    self._line(3),
+                    f'"wordLength"{colon}{length},',
+                    self._line(3),
+                    f'"words"{colon}[',
+                ]
+            )
+        )
+        self.group_count += 1
+
+    def add(self, length, word, translation):
+        if length != self.current_length:
+            if self.current_length is not None:
+                self._close_group()
+            self._open_group(length)
+            self.current_length = length
+        elif self.word_count:
+            self.file.write(",")
+
+        entry = {"word": word, "translation": translation}
+        if self.indent is None:
+            text = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        else:
+            text = json.dumps(entry, ensure_ascii=False, indent=self.indent)
+            text = text.replace("\n", self._line(4))
+        self.file.write(self._line(4) + text)
+        self.word_count += 1
+
+    def finish(self):
+        if self.current_length is not None:
+            self._close_group()
+            self.file.write(self._line(1))
+        self.file.write("]" + ("\n}" if self.indent is not None else "}"))
+
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def export_words(
+    language_code="es",
+    lengths=None,
+    levels=None,
+    db_path=None,
+    output_path=None,
+    compact=False,
+    compress=False,
+    lemmas_only=False,
+):
+    data_dir = f"{language_code}_data"
+    db_path = db_path or os.path.join(data_dir, f"{language_code}.db")
+    if output_path is None:
+        output_path = os.path.join(data_dir, f"words_{language_code}.json")
+        if compress:
+            output_path += ".gz"
 
-def extract_five_letter_words():
     # Ensure directory exists
-    os.makedirs("es_data", exist_ok=True)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    stats = pipeline_stats.get()
 
     # Connect to SQLite database
-    conn = sqlite3.connect("es_data/es.db")
+    conn = stats.track(sqlite3.connect(db_path))
     cursor = conn.cursor()
 
-    # Query 5-letter words from the database
-    cursor.execute("SELECT word, en_translation FROM words WHERE LENGTH(word) = 5")
-    words = cursor.fetchall()
-
-    # Close database connection
-    conn.close()
-
-    if not words:
-        print("No 5-letter words found")
-        return
-
-    # Create output format
-    output_data = {
-        "languageCode": "es",
-        "wordGroups": [
-            {
-                "wordLength": 5,
-                "words": [
-                    {"word": word, "translation": translation}
-                    for word, translation in words
-                ],
-            }
-        ],
-    }
-
-    # Write to output file
-    with open("es_data/words_es.json", "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=4)
+    # Write to a temporary file so a failed export never leaves a truncated file
+    temp_path = output_path + ".tmp"
+    try:
+        with open_output(temp_path, compress) as f:
+            writer = WordGroupWriter(f, language_code, None if compact else 4)
+            writer.start()
+            with stats.stage("export") as stage:
+                rows = query_words(cursor, lengths, levels, lemmas_only)
+                for length, word, translation in rows:
+                    writer.add(length, word, translation)
+                stage.rows += writer.word_count
+            writer.finish()
+    except Exception:
+        # The temp file does not exist yet if opening it was what failed
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+    finally:
+        # Close database connection
+        conn.close()
+
+    if not writer.word_count:
+        os.remove(temp_path)
+        print("No matching words found")
+        return 0
 
+    with stats.stage("rename"):
+        os.replace(temp_path, output_path)
     print(
-        f"Successfully extracted {len(output_data['wordGroups'][0]['words'])} five-letter words"
+        f"Successfully extracted {writer.word_count} words in "
+        f"{writer.group_count} length groups to {output_path}"
     )
+    return writer.word_count
+
+
+def extract_five_letter_words():
+    return export_words("es", lengths=[5])
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(",") if item]
 
 
 if __name__ == "__main__":
-    extract_five_letter_words()
+    parser = argparse.ArgumentParser(
+        description="Export words from a language database as wordGroups JSON."
+    )
+    parser.add_argument(
+        "language_code",
+        nargs="?",
+        default="es",
+        help='The language code of the database (e.g., "es" for Spanish)',
+    )
+    parser.add_argument(
+        "--lengths",
+        type=parse_int_list,
+        help="Comma separated word lengths (default: 5)",
+    )
+    parser.add_argument(
+        "--all-lengths", action="store_true", help="Export words of every length"
+    )
+    parser.add_argument("--levels", type=parse_int_list, help="Comma separated levels")
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument("--output", help="Output JSON file")
+    parser.add_argument(
+        "--compact", action="store_true", help="Write JSON without indentation"
+    )
+    parser.add_argument("--gzip", action="store_true", help="Gzip the output file")
+    parser.add_argument(
+        "--lemmas-only",
+        action="store_true",
+        help="Leave out inflected forms (see lemmatize_words.py)",
+    )
+    pipeline_stats.add_arguments(parser)
+    args = parser.parse_args()
+
+    lengths = None if args.all_lengths else (args.lengths or [5])
+    pipeline_stats.run_with_args(
+        args,
+        "extract_words",
+        export_words,
+        args.language_code,
+        lengths,
+        args.levels,
+        args.db,
+        args.output,
+        args.compact,
+        args.gzip,
+        args.lemmas_only,
+    )
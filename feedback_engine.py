@@ -0,0 +1,234 @@
+"""Wordle-style feedback and candidate filtering over a fixed-length word list.
+
+Words are encoded as an (n, length) NumPy array of letter codes. Feedback
+for a guess is a base-3 pattern number: digit i (weight 3**i) is 0 for gray,
+1 for yellow and 2 for green at position i. Feedback for one guess against
+every candidate, or for every guess against every candidate (the pattern
+matrix), is computed with array operations instead of a Python double loop,
+and the full matrix can be cached on disk next to the database.
+
+Requires NumPy.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+
+from normalize_words import normalize_word
+
+GRAY, YELLOW, GREEN = 0, 1, 2
+
+# Guesses scored per block when building the pattern matrix; bounds the
+# (block, candidates, length) intermediate arrays to a few MB
+GUESS_BLOCK_SIZE = 256
+
+
+def feedback(guess, answer):
+    """Pure-Python reference implementation; returns the pattern number."""
+    digits = [GRAY] * len(guess)
+    remaining = {}
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            digits[i] = GREEN
+        else:
+            remaining[a] = remaining.get(a, 0) + 1
+    for i, g in enumerate(guess):
+        if digits[i] != GREEN and remaining.get(g, 0) > 0:
+            digits[i] = YELLOW
+            remaining[g] -= 1
+    return sum(d * 3**i for i, d in enumerate(digits))
+
+
+def pattern_digits(pattern, length):
+    """Return the gray/yellow/green digits of a pattern number."""
+    return [(pattern // 3**i) % 3 for i in range(length)]
+
+
+def pattern_dtype(length):
+    """Return the smallest unsigned integer type that holds every pattern number."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if 3**length <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+
+def pattern_from_string(text):
+    """Convert "GY..G" style feedback (G green, Y yellow, anything else gray)."""
+    values = {"G": GREEN, "Y": YELLOW}
+    return sum(values.get(c.upper(), GRAY) * 3**i for i, c in enumerate(text))
+
+
+class FeedbackEngine:
+    def __init__(self, words, fold_accents=True):
+        if not words:
+            raise ValueError("FeedbackEngine needs at least one word")
+        self.words = list(words)
+        self.fold_accents = fold_accents
+        keys = [self.key(w) for w in self.words]
+        self.length = len(keys[0])
+        if any(len(key) != self.length for key in keys):
+            raise ValueError("All words must have the same length")
+
+        codepoints = np.array([[ord(c) for c in key] for key in keys], dtype=np.int32)
+        self.alphabet = np.unique(codepoints)
+        self.codes = np.searchsorted(self.alphabet, codepoints).astype(np.int16)
+        self.index = {word: i for i, word in enumerate(self.words)}
+        self.weights = 3 ** np.arange(self.length, dtype=np.int64)
+        self._matrix = None
+
+    def key(self, word):
+        """Return the form of word that letters are compared on."""
+        return normalize_word(word) if self.fold_accents else word
+
+    def encode(self, word):
+        """Return the letter codes of word, or None if it uses unknown letters."""
+        codepoints = np.array([ord(c) for c in self.key(word)], dtype=np.int32)
+        codes = np.searchsorted(self.alphabet, codepoints)
+        codes = np.minimum(codes, len(self.alphabet) - 1)
+        if len(codepoints) != self.length or not np.all(
+            self.alphabet[codes] == codepoints
+        ):
+            return None
+        return codes.astype(np.int16)
+
+    def _score(self, guesses, candidates):
+        """Patterns for (g, length) guesses against (n, length) candidates.
+
+        Position i is yellow when it is not green and the candidate has more
+        non-green copies of the guessed letter than the guess has already
+        used on earlier non-green positions.
+        """
+        greens = guesses[:, None, :] == candidates[None, :, :]
+        patterns = np.zeros(greens.shape[:2], dtype=np.int64)
+        for i in range(self.length):
+            letter = guesses[:, i][:, None]
+            available = np.zeros(greens.shape[:2], dtype=np.int8)
+            for k in range(self.length):
+                available += (candidates[None, :, k] == letter) & ~greens[:, :, k]
+            used = np.zeros(greens.shape[:2], dtype=np.int8)
+            for j in range(i):
+                used += (guesses[:, j][:, None] == letter) & ~greens[:, :, j]
+            yellow = ~greens[:, :, i] & (available > used)
+            patterns += (greens[:, :, i] * GREEN + yellow * YELLOW) * self.weights[i]
+        return patterns
+
+    def patterns_for(self, guess):
+        """Return the pattern of guess against every word, as an int array."""
+        if self._matrix is not None and guess in self.index:
+            return self._matrix[self.index[guess]]
+        codes = self.encode(guess)
+        if codes is None:
+            raise ValueError(f"'{guess}' is not a {self.length}-letter word")
+        return self._score(codes[None, :], self.codes)[0]
+
+    def pattern_matrix(self):
+        """Return the (n, n) matrix of every word guessed against every word."""
+        if self._matrix is None:
+            n = len(self.words)
+            matrix = np.empty((n, n), dtype=pattern_dtype(self.length))
+            for start in range(0, n, GUESS_BLOCK_SIZE):
+                block = self.codes[start : start + GUESS_BLOCK_SIZE]
+                matrix[start : start + len(block)] = self._score(block, self.codes)
+            self._matrix = matrix
+        return self._matrix
+
+    def cache_key(self):
+        digest = hashlib.sha256("\n".join(self.words).encode("utf-8"))
+        if not self.fold_accents:
+            digest.update(b"\0exact")
+        return digest.hexdigest()[:16]
+
+    def load_or_build_matrix(self, cache_dir):
+        """Load the pattern matrix from cache_dir, building and saving it if needed."""
+        path = os.path.join(cache_dir, f"patterns_{self.cache_key()}.npy")
+        if os.path.exists(path):
+            matrix = np.load(path, mmap_mode="r")
+            # Matrices saved before patterns were widened past uint16 are wrong
+            if matrix.dtype == pattern_dtype(self.length):
+                self._matrix = matrix
+                return self._matrix
+            # Release the mapping before the file is rewritten
+            del matrix
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(path, self.pattern_matrix())
+        return self._matrix
+
+    def filter_candidates(self, guess, pattern, candidates=None):
+        """Return the indices of candidates consistent with guess/pattern."""
+        patterns = self.patterns_for(guess)
+        mask = patterns == pattern
+        if candidates is not None:
+            return candidates[mask[candidates]]
+        return np.flatnonzero(mask)
+
+    def remaining_counts(self, guess, candidates=None):
+        """Return a bincount of patterns: how many candidates each leaves."""
+        patterns = self.patterns_for(guess)
+        if candidates is not None:
+            patterns = patterns[candidates]
+        return np.bincount(patterns, minlength=3**self.length)
+
+    def rank_guesses(self, candidates=None, top=10):
+        """Rank guesses by expected information (entropy in bits) over candidates."""
+        matrix = self.pattern_matrix()
+        if candidates is not None:
+            matrix = matrix[:, candidates]
+        total = matrix.shape[1]
+        scores = np.empty(len(self.words))
+        for i in range(len(self.words)):
+            counts = np.bincount(matrix[i], minlength=3**self.length)
+            p = counts[counts > 0] / total
+            scores[i] = -(p * np.log2(p)).sum()
+        order = np.argsort(-scores, kind="stable")[:top]
+        return [(self.words[i], float(scores[i])) for i in order]
+
+
+def load_words(db_path, length=5):
+    """Return words of the given length; rows whose stored length is wrong are skipped."""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(
+            "SELECT word FROM words WHERE length = ? ORDER BY word", (length,)
+        )
+        return [row[0] for row in cursor if len(normalize_word(row[0])) == length]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rank guesses or filter candidates with Wordle-style feedback."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument("--length", type=int, default=5, help="Word length")
+    parser.add_argument(
+        "--cache-dir", help="Directory for the cached pattern matrix (default: none)"
+    )
+    parser.add_argument(
+        "--guess",
+        nargs=2,
+        action="append",
+        metavar=("WORD", "FEEDBACK"),
+        help='Apply a guess and its feedback, e.g. --guess costa "GY..."',
+    )
+    parser.add_argument("--top", type=int, default=10, help="Number of guesses to rank")
+    args = parser.parse_args()
+
+    engine = FeedbackEngine(
+        load_words(args.db or os.path.join("es_data", "es.db"), args.length)
+    )
+    if args.cache_dir:
+        engine.load_or_build_matrix(args.cache_dir)
+
+    remaining = np.arange(len(engine.words))
+    for word, text in args.guess or []:
+        remaining = engine.filter_candidates(word, pattern_from_string(text), remaining)
+    print(f"{len(remaining)} candidates remaining")
+    if len(remaining) <= 20:
+        print(", ".join(engine.words[i] for i in remaining))
+    if len(remaining) > 1:
+        for word, bits in engine.rank_guesses(remaining, args.top):
+            print(f"{word}  {bits:.3f} bits")
@@ -0,0 +1,261 @@
+import argparse
+import json
+import math
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from extract_words import parse_int_list
+
+""" example of usage
+python generate_schedule.py --start 2026-01-01 --years 5 --lengths 5 --levels 1,2,3,4,5
+python generate_schedule.py --start 2026-01-01 --years 5 --output es_data/schedule_es.json
+"""
+
+# No word is scheduled again until at least this many days have passed, even
+# across the boundary between two passes over the candidate list (capped at
+# half the number of candidates)
+DEFAULT_MIN_GAP = 365
+
+
+def candidates_query(
+    lengths=None,
+    levels=None,
+    min_frequency=None,
+    lemmas_only=False,
+    lemma_frequency=False,
+):
+    """Return the (sql, params) that load_candidates runs."""
+    frequency = "COALESCE(frequency, 0)"
+    if lemma_frequency:
+        frequency = """COALESCE(
+            (SELECT SUM(f.frequency) FROM words f WHERE f.lemma = words.lemma),
+            frequency, 0)"""
+    conditions = []
+    params = []
+    if lengths:
+        conditions.append(f"length IN ({','.join('?' * len(lengths))})")
+        params.extend(lengths)
+    if levels:
+        conditions.append(f"level IN ({','.join('?' * len(levels))})")
+        params.extend(levels)
+    if min_frequency is not None:
+        conditions.append(f"{frequency} >= ?")
+        params.append(min_frequency)
+    if lemmas_only:
+        conditions.append("(lemma IS NULL OR lemma = word)")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT word, {frequency} FROM words {where} ORDER BY word", params
+
+
+def load_candidates(
+    conn,
+    lengths=None,
+    levels=None,
+    min_frequency=None,
+    lemmas_only=False,
+    lemma_frequency=False,
+):
+    """Return (word, frequency) candidates sorted by word for determinism.
+
+    With lemma_frequency, a word's frequency is the total over every word
+    sharing its lemma, so "casa" also counts "casas".
+    """
+    sql, params = candidates_query(
+        lengths, levels, min_frequency, lemmas_only, lemma_frequency
+    )
+    return conn.execute(sql, params).fetchall()
+
+
+def shuffled(candidates, rng, weighted):
+    """Return the candidate words in random order.
+
+    With weighted, more frequent words tend to come earlier in each pass
+    (Efraimidis-Spirakis weighted sampling without replacement).
+    """
+    if not weighted:
+        words = [word for word, _ in candidates]
+        rng.shuffle(words)
+        return words
+    # log(u) / w orders the same as u ** (1 / w) without underflowing to 0
+    # for rare words; 1 - random() keeps u in (0, 1]
+    keyed = [
+        (math.log(1.0 - rng.random()) / (frequency + 1e-6), word)
+        for word, frequency in candidates
+    ]
+    keyed.sort(reverse=True)
+    return [word for _, word in keyed]
+
+
+def build_schedule(candidates, days, seed=0, weighted=False, min_gap=DEFAULT_MIN_GAP):
+    """Return a list of days words drawn from candidates without repeats.
+
+    Each pass over the candidates is a fresh permutation; when a pass ends,
+    words used in the last min_gap days are moved to the back of the next
+    pass in the order they were last used, so they are not repeated too
+    soon. The gap is capped at half the candidates to keep passes random.
+    """
+    if not candidates:
+        raise ValueError("No candidate words match the filters")
+    rng = random.Random(seed)
+    gap = min(min_gap, len(candidates) // 2)
+
+    schedule = []
+    while len(schedule) < days:
+        order = shuffled(candidates, rng, weighted)
+        if schedule and gap > 0:
+            recent = {word: i for i, word in enumerate(schedule[-gap:])}
+            order = [word for word in order if word not in recent] + sorted(
+                recent, key=recent.get
+            )
+        schedule.extend(order)
+    return schedule[:days]
+
+
+def write_schedule_table(conn, start, schedule):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_words (
+            day_index INTEGER PRIMARY KEY,
+            date TEXT NOT NULL UNIQUE,
+            word TEXT NOT NULL,
+            FOREIGN KEY (word) REFERENCES words(word)
+        )
+        """
+    )
+    conn.execute("DELETE FROM daily_words")
+    conn.executemany(
+        "INSERT INTO daily_words (day_index, date, word) VALUES (?, ?, ?)",
+        (
+            (index, (start + timedelta(days=index)).isoformat(), word)
+            for index, word in enumerate(schedule)
+        ),
+    )
+
+
+def write_schedule_file(path, language_code, start, seed, schedule):
+    """Write the schedule as compact JSON; the client indexes by days since start."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "languageCode": language_code,
+                "start": start.isoformat(),
+                "seed": seed,
+                "words": schedule,
+            },
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+
+def generate_schedule(
+    start,
+    years=1,
+    language_code="es",
+    lengths=None,
+    levels=None,
+    min_frequency=None,
+    seed=0,
+    weighted=False,
+    db_path=None,
+    output_path=None,
+    lemmas_only=False,
+    lemma_frequency=False,
+):
+    db_path = db_path or os.path.join(f"{language_code}_data", f"{language_code}.db")
+    # A schedule starting on February 29th ends on February 28th
+    day = 28 if (start.month, start.day) == (2, 29) else start.day
+    end = date(start.year + years, start.month, day)
+    days = (end - start).days
+
+    conn = sqlite3.connect(db_path)
+    try:
+        candidates = load_candidates(
+            conn, lengths, levels, min_frequency, lemmas_only, lemma_frequency
+        )
+        schedule = build_schedule(candidates, days, seed, weighted)
+        if output_path:
+            write_schedule_file(output_path, language_code, start, seed, schedule)
+        else:
+            write_schedule_table(conn, start, schedule)
+            conn.commit()
+    finally:
+        conn.close()
+
+    target = output_path or f"daily_words table in {db_path}"
+    print(
+        f"Scheduled {days} days from {start.isoformat()} using "
+        f"{len(candidates)} candidate words to {target}"
+    )
+    return schedule
+
+
+def word_for_date(schedule_path, day):
+    """Look up the word for a date in a schedule file written by this script."""
+    with open(schedule_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    index = (day - date.fromisoformat(data["start"])).days
+    if index < 0 or index >= len(data["words"]):
+        return None
+    return data["words"][index]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Precompute a seeded daily word schedule from the words table."
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=date(date.today().year, 1, 1),
+        help="First day of the schedule, YYYY-MM-DD (default: January 1st)",
+    )
+    parser.add_argument("--years", type=int, default=1, help="Years to schedule")
+    parser.add_argument(
+        "--language-code", default="es", help="Language code of the database"
+    )
+    parser.add_argument(
+        "--lengths", type=parse_int_list, default=[5], help="Comma separated lengths"
+    )
+    parser.add_argument("--levels", type=parse_int_list, help="Comma separated levels")
+    parser.add_argument(
+        "--min-frequency", type=float, help="Only words at least this frequent"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--weighted",
+        action="store_true",
+        help="Favor frequent words early in each pass over the list",
+    )
+    parser.add_argument(
+        "--lemmas-only",
+        action="store_true",
+        help="Only schedule lemmas, not inflected forms (see lemmatize_words.py)",
+    )
+    parser.add_argument(
+        "--lemma-frequency",
+        action="store_true",
+        help="Use the total frequency of all forms of a word's lemma",
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--output", help="Write a JSON schedule file instead of the daily_words table"
+    )
+    args = parser.parse_args()
+
+    generate_schedule(
+        args.start,
+        args.years,
+        args.language_code,
+        args.lengths,
+        args.levels,
+        args.min_frequency,
+        args.seed,
+        args.weighted,
+        args.db,
+        args.output,
+        args.lemmas_only,
+        args.lemma_frequency,
+    )
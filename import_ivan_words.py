@@ -1,42 +1,397 @@
+import argparse
 import csv
 import sqlite3
+import time
+from contextlib import nullcontext
+from itertools import islice
 from pathlib import Path
 
+import pipeline_stats
+from build_state import (
+    changed_keys,
+    file_hash,
+    is_unchanged,
+    record_file,
+    record_rows,
+    row_hash,
+)
+from normalize_words import ensure_normalized_column, fold_enye_rule, normalize_word
+from translation_search import bulk_translation_load
 
-def import_words():
+DEFAULT_CHUNK_SIZE = 5000
+
+# Mirrors the CHECK constraints on the words table so most bad rows are
+# rejected before they reach SQLite
+MAX_WORD_LENGTH = 15
+MAX_TRANSLATION_LENGTH = 120
+
+# SQLITE_MAX_VARIABLE_NUMBER before SQLite 3.32, still common on distro Pythons
+MAX_PARAMETERS = 999
+
+EXISTING_WORDS_SQL = "SELECT word, source FROM words WHERE word IN ({placeholders})"
+
+
+def read_rows(csv_path):
+    """Yield (line_number, row) pairs from the CSV without loading the whole file."""
+    with open(csv_path, "r", encoding="utf-8", newline="") as file:
+        csv_reader = csv.DictReader(file)
+        for row in csv_reader:
+            yield csv_reader.line_num, row
+
+
+def chunked(iterable, size):
+    """Group an iterable into lists of at most size items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_row(row):
+    """Return (values, None) for a valid row or (None, reason) for a rejected one."""
+    word = (row.get("word") or "").strip()
+    translation = (row.get("translation") or "").strip()
+
+    if not word:
+        return None, "missing word"
+    if len(word) > MAX_WORD_LENGTH:
+        return None, f"word exceeds {MAX_WORD_LENGTH} characters"
+    if len(translation) > MAX_TRANSLATION_LENGTH:
+        return None, f"translation exceeds {MAX_TRANSLATION_LENGTH} characters"
+    try:
+        length = int(row.get("length") or "")
+    except ValueError:
+        return None, f"invalid length '{row.get('length')}'"
+    if length < 1 or length > MAX_WORD_LENGTH:
+        return None, f"length {length} out of range"
+
+    return (word, translation, length), None
+
+
+class RejectWriter:
+    """Write rejected rows and the reason they were rejected to a side CSV file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line_number, row, reason):
+        # Only create the file once there is something to put in it
+        if self._writer is None:
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["line", "word", "translation", "length", "reason"])
+        self._writer.writerow(
+            [
+                line_number,
+                row.get("word"),
+                row.get("translation"),
+                row.get("length"),
+                reason,
+            ]
+        )
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def configure_bulk_load(conn):
+    """Tune the connection for a bulk load; durability is restored on close."""
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -65536")
+
+
+def existing_words(cursor, words):
+    """Return {word: source} for the words already present in the words table."""
+    found = {}
+    for batch in chunked(words, MAX_PARAMETERS):
+        placeholders = ",".join("?" * len(batch))
+        cursor.execute(EXISTING_WORDS_SQL.format(placeholders=placeholders), batch)
+        found.update(cursor.fetchall())
+    return found
+
+
+def insert_chunk(
+    conn,
+    insert_stmt,
+    chunk,
+    rejects,
+    source,
+    fold_enye=False,
+    upsert=False,
+    applied=None,
+    seen=None,
+    unchanged=None,
+):
+    """Write one chunk of (line_number, row) pairs in a single transaction.
+
+    Rows for words already in the table are rejected, unless upsert is set
+    and the stored word belongs to the same source; insert_stmt must then
+    handle them as an upsert. seen holds the words of earlier chunks, so a
+    word repeated anywhere in the input is rejected; rows whose line number
+    is in unchanged are only checked for repeats, not written. The line
+    numbers of the rows that were written are added to the applied set, if
+    given. Returns (inserted, updated).
+    """
+    stats = pipeline_stats.get()
+    cursor = conn.cursor()
+    pending = []
+    seen = set() if seen is None else seen
+
+    with stats.stage("validate") as stage:
+        for line_number, row in chunk:
+            values, reason = validate_row(row)
+            if reason is None and values[0] in seen:
+                reason = "duplicate word in input"
+            if reason is not None:
+                rejects.write(line_number, row, reason)
+                stage.errors += 1
+                continue
+            seen.add(values[0])
+            if unchanged and line_number in unchanged:
+                continue
+            normalized = normalize_word(values[0], fold_enye)
+            pending.append((line_number, row, values + (source, normalized)))
+        stage.rows += len(chunk)
+
+    new_rows = []
+    changed_rows = []
+    with stats.stage("constraint_checks") as stage:
+        owners = existing_words(cursor, [values[0] for _, _, values in pending])
+        for line_number, row, values in pending:
+            owner = owners.get(values[0])
+            if owner is None:
+                new_rows.append((line_number, row, values))
+            elif upsert and owner == source:
+                changed_rows.append((line_number, row, values))
+            elif upsert:
+                rejects.write(line_number, row, f"word belongs to source '{owner}'")
+            else:
+                rejects.write(line_number, row, "word already exists")
+        stage.rows += len(pending)
+        stage.errors += len(pending) - len(new_rows) - len(changed_rows)
+
+    if not new_rows and not changed_rows:
+        return 0, 0
+
+    cursor.execute("BEGIN")
+    try:
+        with stats.stage("insert") as stage:
+            cursor.executemany(insert_stmt, [values for _, _, values in new_rows])
+            stage.rows += len(new_rows)
+        if changed_rows:
+            with stats.stage("upsert") as stage:
+                cursor.executemany(
+                    insert_stmt, [values for _, _, values in changed_rows]
+                )
+                stage.rows += len(changed_rows)
+        with stats.stage("commit"):
+            cursor.execute("COMMIT")
+        if applied is not None:
+            applied.update(line_number for line_number, _, _ in new_rows)
+            applied.update(line_number for line_number, _, _ in changed_rows)
+        return len(new_rows), len(changed_rows)
+    except sqlite3.Error:
+        cursor.execute("ROLLBACK")
+
+    # Something in the chunk still violated a constraint; retry row by row so
+    # that only the offending rows are rejected
+    counts = [0, 0]
+    cursor.execute("BEGIN")
+    with stats.stage("insert_row_by_row") as stage:
+        for kind, batch in enumerate((new_rows, changed_rows)):
+            for line_number, row, values in batch:
+                try:
+                    cursor.execute(insert_stmt, values)
+                    counts[kind] += 1
+                    if applied is not None:
+                        applied.add(line_number)
+                except sqlite3.Error as e:
+                    rejects.write(line_number, row, str(e))
+                    stage.errors += 1
+            stage.rows += len(batch)
+    with stats.stage("commit"):
+        cursor.execute("COMMIT")
+    return counts[0], counts[1]
+
+
+def import_words(
+    csv_path=None,
+    db_path=None,
+    source="ivan",
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    rejects_path=None,
+    incremental=False,
+):
     # Get the absolute path to the CSV file and database
     current_dir = Path(__file__).parent
-    csv_path = current_dir / "es_data/es_en_5.csv"
-    db_path = current_dir / "es_data/es.db"
+    csv_path = Path(csv_path) if csv_path else current_dir / "es_data/es_en_5.csv"
+    db_path = Path(db_path) if db_path else current_dir / "es_data/es.db"
+    if rejects_path is None:
+        rejects_path = csv_path.with_suffix(".rejected.csv")
 
-    # Connect to the database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    stats = pipeline_stats.get()
 
-    # Read the CSV file
-    with open(csv_path, "r", encoding="utf-8") as file:
-        csv_reader = csv.DictReader(file)
+    # Connect to the database; transactions are managed per chunk
+    conn = stats.track(sqlite3.connect(db_path, isolation_level=None))
+    configure_bulk_load(conn)
+    ensure_normalized_column(conn)
+    # normalized_word follows the rule the database was built with
+    fold_enye = fold_enye_rule(conn)
+
+    if incremental:
+        content_hash = file_hash(csv_path)
+        if is_unchanged(conn, "import", csv_path, content_hash):
+            conn.close()
+            print(f"Skipping import: {csv_path} is unchanged since the last import")
+            return 0, 0, 0
 
-        # Prepare the insert statement
-        insert_stmt = """
-        INSERT INTO words (word, en_translation, length, frequency, level, source)
-        VALUES (?, ?, ?, 0, 0, 'ivan')
+    # Prepare the insert statement
+    insert_stmt = """
+    INSERT INTO words
+        (word, en_translation, length, frequency, level, source, normalized_word)
+    VALUES (?, ?, ?, 0, 0, ?, ?)
+    """
+    if incremental:
+        # Changed rows replace the data of words this source already owns;
+        # insert_chunk rejects words owned by another source
+        insert_stmt += """
+        ON CONFLICT (word) DO UPDATE SET
+            en_translation = excluded.en_translation,
+            length = excluded.length,
+            normalized_word = excluded.normalized_word
+        WHERE words.source = excluded.source
         """
 
-        # Insert each row
-        for row in csv_reader:
-            try:
-                cursor.execute(
-                    insert_stmt, (row["word"], row["translation"], int(row["length"]))
+    rejects = RejectWriter(rejects_path)
+    total_rows = 0
+    inserted = 0
+    updated = 0
+    # Words of every row read so far, so repeats are caught across chunks
+    seen = set()
+    start = time.perf_counter()
+
+    try:
+        # A full import rebuilds words_fts once at the end instead of through
+        # its triggers; an incremental one usually changes only a few rows
+        translations = nullcontext() if incremental else bulk_translation_load(conn)
+        with translations:
+            chunks = chunked(read_rows(csv_path), chunk_size)
+            while True:
+                with stats.stage("parse") as stage:
+                    chunk = next(chunks, None)
+                    stage.rows += len(chunk or ())
+                if chunk is None:
+                    break
+                total_rows += len(chunk)
+                unchanged = None
+                if incremental:
+                    lines = [line_number for line_number, _ in chunk]
+                    hashed = [
+                        (
+                            (row.get("word") or "").strip(),
+                            row_hash((row.get("translation"), row.get("length"))),
+                        )
+                        for _, row in chunk
+                    ]
+                    changed = changed_keys(conn, "import", csv_path, hashed)
+                    unchanged = {
+                        line_number
+                        for line_number, (key, _) in zip(lines, hashed)
+                        if key not in changed
+                    }
+                applied = set()
+                chunk_inserted, chunk_updated = insert_chunk(
+                    conn,
+                    insert_stmt,
+                    chunk,
+                    rejects,
+                    source,
+                    fold_enye,
+                    upsert=incremental,
+                    applied=applied,
+                    seen=seen,
+                    unchanged=unchanged,
                 )
-            except sqlite3.Error as e:
-                print(f"Error inserting word '{row['word']}': {e}")
+                inserted += chunk_inserted
+                updated += chunk_updated
+                if incremental:
+                    # Rejected rows are not recorded, so the next run retries them
+                    conn.execute("BEGIN")
+                    record_rows(
+                        conn,
+                        "import",
+                        csv_path,
+                        [
+                            pair
+                            for line_number, pair in zip(lines, hashed)
+                            if line_number in applied
+                        ],
+                    )
+                    conn.execute("COMMIT")
+
+        if incremental:
+            record_file(conn, "import", csv_path, content_hash, total_rows)
+    finally:
+        rejects.close()
+        conn.close()
 
-    # Commit the changes and close the connection
-    conn.commit()
-    conn.close()
-    print("Import completed successfully!")
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"Import completed: {inserted} inserted, {updated} updated, {rejects.count} rejected "
+        f"of {total_rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)"
+    )
+    if rejects.count:
+        print(f"Rejected rows written to {rejects_path}")
+
+    return inserted, updated, rejects.count
 
 
 if __name__ == "__main__":
-    import_words()
+    parser = argparse.ArgumentParser(
+        description="Bulk import words from a CSV file into the words table."
+    )
+    parser.add_argument(
+        "--csv", help="CSV file with word, translation and length columns"
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--source", default="ivan", help="4-character short name of the word source"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of rows written per transaction",
+    )
+    parser.add_argument(
+        "--rejects", help="CSV file for rejected rows (default: <csv>.rejected.csv)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip an unchanged CSV and only apply new or changed rows",
+    )
+    pipeline_stats.add_arguments(parser)
+    args = parser.parse_args()
+
+    pipeline_stats.run_with_args(
+        args,
+        "import_ivan_words",
+        import_words,
+        args.csv,
+        args.db,
+        args.source,
+        args.chunk_size,
+        args.rejects,
+        args.incremental,
+    )
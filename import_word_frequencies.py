@@ -0,0 +1,168 @@
+import argparse
+import math
+import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
+
+from build_state import file_hash, is_unchanged, record_file, words_generation
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def read_frequencies(freq_path):
+    """Yield (word, count) pairs from a "word count" frequency list.
+
+    Comment lines starting with # and malformed lines are skipped.
+    """
+    with open(freq_path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("#"):
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                continue
+            word, count = parts
+            try:
+                yield word, int(count)
+            except ValueError:
+                continue
+
+
+def load_counts(conn, freq_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream the frequency list into a temp table, keeping only known words.
+
+    Returns (lines_read, max_count) where max_count is taken over the whole
+    list, not just the words that are in the database.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        CREATE TEMP TABLE word_counts (
+            word TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        )
+        """
+    )
+
+    # Only rows for words in the words table are kept, so the temp table is
+    # bounded by the vocabulary size rather than the frequency list size
+    insert_stmt = """
+        INSERT INTO word_counts (word, count)
+        SELECT ?1, ?2 WHERE EXISTS (SELECT 1 FROM words WHERE word = ?1)
+        ON CONFLICT(word) DO UPDATE SET count = count + excluded.count
+    """
+
+    lines_read = 0
+    max_count = 0
+    rows = read_frequencies(freq_path)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        lines_read += len(chunk)
+        max_count = max(max_count, max(count for _, count in chunk))
+        cursor.executemany(insert_stmt, chunk)
+
+    return lines_read, max_count
+
+
+def apply_frequencies(conn, max_count, log_scale=False):
+    """Set words.frequency from the temp table in a single joined UPDATE.
+
+    Returns the number of words updated.
+    """
+    if max_count <= 0:
+        return 0
+
+    if log_scale:
+        conn.create_function("log1p", 1, math.log1p, deterministic=True)
+        expression = "log1p(word_counts.count) / ?"
+        denominator = math.log1p(max_count)
+    else:
+        expression = "CAST(word_counts.count AS REAL) / ?"
+        denominator = max_count
+
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        UPDATE words
+        SET frequency = MIN(1.0, {expression})
+        FROM word_counts
+        WHERE words.word = word_counts.word
+        """,
+        (denominator,),
+    )
+    return cursor.rowcount
+
+
+def import_word_frequencies(
+    freq_path=None,
+    db_path=None,
+    log_scale=False,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    incremental=False,
+):
+    current_dir = Path(__file__).parent
+    freq_path = freq_path or current_dir / "es_data/es-word-frequencies.txt"
+    db_path = db_path or current_dir / "es_data/es.db"
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        # The normalization depends on the whole list, so a changed file is
+        # always reapplied in full; only an unchanged one can be skipped, and
+        # only if no words were added or removed since it was applied
+        if incremental:
+            content_hash = file_hash(freq_path)
+            generation = words_generation(conn)
+            if is_unchanged(conn, "frequencies", freq_path, content_hash, generation):
+                print(
+                    f"Skipping frequencies: {freq_path} is unchanged since the last run"
+                )
+                return 0
+
+        lines_read, max_count = load_counts(conn, freq_path, chunk_size)
+        updated = apply_frequencies(conn, max_count, log_scale)
+        if incremental:
+            record_file(
+                conn, "frequencies", freq_path, content_hash, lines_read, generation
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    scale = "log" if log_scale else "linear"
+    print(
+        f"Frequencies updated for {updated} words from {lines_read} lines "
+        f"({scale} scale) in {elapsed:.2f}s"
+    )
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Populate words.frequency from a 'word count' frequency list."
+    )
+    parser.add_argument("--freq", help="Frequency list file")
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--log", action="store_true", help="Normalize log(count) instead of count"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of frequency lines inserted per batch",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip the frequency list if it is unchanged since the last run",
+    )
+    args = parser.parse_args()
+
+    import_word_frequencies(
+        args.freq, args.db, args.log, args.chunk_size, args.incremental
+    )
@@ -0,0 +1,206 @@
+"""Assign each word its lemma (dictionary form), e.g. "tasen" -> "tasar".
+
+Lemmas come from a lookup dictionary (CSV with word and lemma columns,
+es_data/es_lemmas.csv by default) and otherwise from Spanish suffix rules:
+regular verb endings are replaced by -ar/-er/-ir and plural -s/-es is
+dropped. A rule's candidate is only accepted if it is a known word (in the
+words table or the frequency list), is not much rarer than the form itself
+and, for verbs, has other known forms, so "casa" stays "casa" rather than
+becoming "casar". Words no rule applies to are their own lemma. Irregular
+verbs (tiene, era) and remaining rule mistakes need dictionary entries.
+
+The whole table is lemmatized in one pass in memory and written back with
+a single joined UPDATE into the indexed lemma column, which the exporters
+use to keep only lemmas or to add up frequencies per lemma.
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+from functools import lru_cache
+
+from import_word_frequencies import read_frequencies
+
+# Infinitive ending -> regular inflected endings that map back to it
+VERB_ENDINGS = {
+    "ar": """o as a amos áis an e es emos éis en é aste ó asteis aron
+        aba abas ábamos abais aban ad ando ado ada ados adas
+        aré arás ará aremos aréis arán aría arías aríamos aríais arían""",
+    "er": """o es e emos éis en a as amos áis an í iste ió imos isteis ieron
+        ía ías íamos íais ían ed iendo ido ida idos idas
+        eré erás erá eremos eréis erán ería erías eríamos eríais erían""",
+    "ir": """o es e imos ís en a as amos áis an í iste ió isteis ieron
+        ía ías íamos íais ían id iendo ido ida idos idas
+        iré irás irá iremos iréis irán iría irías iríamos iríais irían""",
+}
+
+# Inflected ending -> infinitive endings, precompiled once
+SUFFIX_RULES = {}
+for infinitive, endings in VERB_ENDINGS.items():
+    for ending in endings.split():
+        SUFFIX_RULES.setdefault(ending, []).append(infinitive)
+ENDING_LENGTHS = sorted({len(ending) for ending in SUFFIX_RULES}, reverse=True)
+
+VOWELS = set("aeiouáéíóú")
+MIN_VERB_STEM = 2
+MIN_NOUN_LEMMA = 3
+
+# A candidate lemma may be at most this many times rarer than the form
+LEMMA_RATIO = 4
+
+
+# Forms that confirm an infinitive candidate really is a verb: its gerund
+# or past participle must be a known word (rules out primo -> primer)
+VERB_EVIDENCE = {"ar": ("ando", "ado"), "er": ("iendo", "ido"), "ir": ("iendo", "ido")}
+
+
+@lru_cache(maxsize=None)
+def candidates(word):
+    """Return possible (lemma, strong, weak) candidates of a lowercase word.
+
+    For verb candidates, strong is the gerund and participle and weak is
+    every other regular form of the verb; plural candidates have neither.
+    """
+    found = []
+    for size in ENDING_LENGTHS:
+        ending = word[-size:]
+        stem = word[:-size]
+        if len(word) > size and ending in SUFFIX_RULES and len(stem) >= MIN_VERB_STEM:
+            for infinitive in SUFFIX_RULES[ending]:
+                strong = tuple(stem + form for form in VERB_EVIDENCE[infinitive])
+                weak = tuple(
+                    stem + form
+                    for form in VERB_ENDINGS[infinitive].split()
+                    if stem + form != word
+                )
+                found.append((stem + infinitive, strong, weak))
+    # Plurals: casas -> casa, flores -> flor
+    if word.endswith("es") and word[-3:-2] not in VOWELS:
+        found.append((word[:-2], (), ()))
+    if word.endswith("s") and word[-2:-1] in VOWELS:
+        found.append((word[:-1], (), ()))
+    return tuple(
+        candidate
+        for candidate in found
+        if len(candidate[0]) >= MIN_NOUN_LEMMA and candidate[0] != word
+    )
+
+
+def read_dictionary(path):
+    """Read a CSV with word and lemma columns into {word: lemma}."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {
+            row["word"].strip(): row["lemma"].strip()
+            for row in csv.DictReader(f)
+            if row.get("word") and row.get("lemma")
+        }
+
+
+def lemma_for(word, counts, dictionary=None):
+    """Return the lemma of word given corpus counts of known words."""
+    if dictionary and word in dictionary:
+        return dictionary[word]
+    lowered = word.lower()
+    word_count = counts.get(lowered, 0)
+    best = None
+    best_count = -1
+    for candidate, strong, weak in candidates(lowered):
+        count = counts.get(candidate)
+        if count is None or count * LEMMA_RATIO < word_count:
+            continue
+        # A verb needs another of its forms to be known too; corpus words
+        # need the gerund or participle, since their forms are often nouns
+        # or adjectives (primo, primer)
+        evidence = strong if word_count else weak
+        if evidence and not any(form in counts for form in evidence):
+            continue
+        if count > best_count:
+            best, best_count = candidate, count
+    return best or word
+
+
+def lemmatize(words, counts, dictionary=None):
+    """Return [(word, lemma), ...] for every word."""
+    return [(word, lemma_for(word, counts, dictionary)) for word in words]
+
+
+def lemmatize_words(db_path=None, freq_path=None, dictionary_path=None, force=False):
+    db_path = db_path or os.path.join("es_data", "es.db")
+    freq_path = freq_path or os.path.join("es_data", "es-word-frequencies.txt")
+    if dictionary_path is None:
+        # The bundled dictionary of irregular forms and known rule mistakes
+        bundled = os.path.join(os.path.dirname(db_path), "es_lemmas.csv")
+        dictionary_path = bundled if os.path.exists(bundled) else None
+    dictionary = read_dictionary(dictionary_path) if dictionary_path else None
+
+    conn = sqlite3.connect(db_path)
+    try:
+        words = [word for (word,) in conn.execute("SELECT word FROM words")]
+        # Known words: the frequency list plus the words table itself
+        counts = dict(read_frequencies(freq_path)) if os.path.exists(freq_path) else {}
+        for word in words:
+            counts.setdefault(word.lower(), 0)
+
+        if force:
+            targets = words
+        else:
+            targets = [
+                word
+                for (word,) in conn.execute(
+                    "SELECT word FROM words WHERE lemma IS NULL"
+                )
+            ]
+        lemmas = lemmatize(targets, counts, dictionary)
+
+        conn.execute(
+            """
+            CREATE TEMP TABLE new_lemmas (
+                word TEXT PRIMARY KEY,
+                lemma TEXT NOT NULL
+            )
+            """
+        )
+        conn.executemany("INSERT INTO new_lemmas (word, lemma) VALUES (?, ?)", lemmas)
+        cursor = conn.execute(
+            """
+            UPDATE words
+            SET lemma = n.lemma
+            FROM new_lemmas n
+            WHERE words.word = n.word AND words.lemma IS NOT n.lemma
+            """
+        )
+        updated = cursor.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+
+    grouped = sum(1 for word, lemma in lemmas if lemma != word)
+    print(
+        f"Lemmatized {len(lemmas)} words ({grouped} mapped to another form, "
+        f"{len({lemma for _, lemma in lemmas})} distinct lemmas); {updated} updated"
+    )
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fill the lemma column using a dictionary and Spanish suffix rules."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--freq", help="Frequency list used to validate candidate lemmas"
+    )
+    parser.add_argument(
+        "--dictionary",
+        help="CSV with word and lemma columns, checked before rules "
+        "(default: es_lemmas.csv next to the database, if present)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute every lemma, not just rows without one",
+    )
+    args = parser.parse_args()
+
+    lemmatize_words(args.db, args.freq, args.dictionary, args.force)
@@ -0,0 +1,313 @@
+"""Letter, positional letter and bigram counts per word length, cached in the database.
+
+letter_stats holds one row per (language_code, length) with JSON counts of
+the accent-folded letters of every word of that length (ñ is kept), of the
+letters at each position and of adjacent letter pairs. Triggers on words
+delete a length's row whenever a word of that length is inserted, deleted or
+renamed, so a missing row means "stale": the next read recomputes the
+lengths it needs, in one pass over words with NumPy, and stores them again.
+Readers therefore get current counts from a single keyed lookup instead of
+rescanning the words table.
+
+Positional and bigram counts only include words whose folded form has as
+many letters as their length column says (see validate_words.py).
+
+Counting uses NumPy when it is installed and falls back to pure Python
+otherwise. The table and its triggers are created by createEsWordDB.py and
+migrate_schema.py; reading never creates them, and a database without the
+table simply has no cached stats.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from normalize_words import normalize_word
+
+LOAD_SQL = """
+    SELECT word_count, letters, positions, bigrams FROM letter_stats
+    WHERE language_code = ? AND length = ?
+    """
+
+
+def ensure_letter_stats(conn):
+    """Create letter_stats and its invalidation triggers if missing.
+
+    Returns True if the table was created.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'letter_stats'"
+    ).fetchone()
+    if exists:
+        return False
+    conn.execute(
+        """
+        CREATE TABLE letter_stats (
+            language_code TEXT NOT NULL,
+            length INTEGER NOT NULL,
+            word_count INTEGER NOT NULL,
+            letters TEXT NOT NULL,
+            positions TEXT NOT NULL,
+            bigrams TEXT NOT NULL,
+            updated TEXT NOT NULL,
+            PRIMARY KEY (language_code, length)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER letter_stats_insert AFTER INSERT ON words BEGIN
+            DELETE FROM letter_stats WHERE length = new.length;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER letter_stats_delete AFTER DELETE ON words BEGIN
+            DELETE FROM letter_stats WHERE length = old.length;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER letter_stats_update AFTER UPDATE OF word, length ON words BEGIN
+            DELETE FROM letter_stats WHERE length IN (old.length, new.length);
+        END
+        """
+    )
+    return True
+
+
+def has_letter_stats(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'letter_stats'"
+    ).fetchone()
+    return row is not None
+
+
+def _count_letters_python(keys, length):
+    """Pure-Python count_letters, with the same result in the same key order."""
+    letters = Counter()
+    positions = [Counter() for _ in range(length)]
+    bigrams = Counter()
+    for key in keys:
+        letters.update(key)
+        if len(key) != length:
+            continue
+        for position, letter in enumerate(key):
+            positions[position][letter] += 1
+        bigrams.update(a + b for a, b in zip(key, key[1:]))
+    return {
+        "word_count": len(keys),
+        "letters": dict(sorted(letters.items())),
+        "positions": [dict(sorted(counts.items())) for counts in positions],
+        "bigrams": dict(sorted(bigrams.items())),
+    }
+
+
+def count_letters(words, length):
+    """Return letter, positional and bigram counts for words of one length."""
+    keys = [normalize_word(word) for word in words]
+    try:
+        import numpy as np
+    except ImportError:
+        return _count_letters_python(keys, length)
+
+    # Decode every letter of every word to code points in one step
+    text = "".join(keys).encode("utf-32-le")
+    codepoints = np.frombuffer(text, dtype=np.uint32)
+    alphabet, codes = np.unique(codepoints, return_inverse=True)
+    size = len(alphabet)
+    letters = np.bincount(codes, minlength=size)
+
+    fixed = "".join(key for key in keys if len(key) == length).encode("utf-32-le")
+    grid = np.searchsorted(alphabet, np.frombuffer(fixed, dtype=np.uint32))
+    grid = grid.reshape(-1, length)
+    # Offset each column by position * size so one bincount covers them all
+    offsets = np.arange(length) * size
+    positions = np.bincount((grid + offsets).ravel(), minlength=length * size)
+    positions = positions.reshape(length, size)
+    bigrams = np.bincount(
+        (grid[:, :-1] * size + grid[:, 1:]).ravel(), minlength=size * size
+    )
+
+    chars = [chr(c) for c in alphabet]
+    return {
+        "word_count": len(keys),
+        "letters": {chars[i]: int(letters[i]) for i in np.flatnonzero(letters)},
+        "positions": [
+            {chars[i]: int(row[i]) for i in np.flatnonzero(row)} for row in positions
+        ],
+        "bigrams": {
+            chars[i // size] + chars[i % size]: int(bigrams[i])
+            for i in np.flatnonzero(bigrams)
+        },
+    }
+
+
+def language_code(conn):
+    return conn.execute("SELECT language_code FROM language_info").fetchone()[0]
+
+
+def stale_lengths(conn, code):
+    """Return the word lengths present in words without stored stats."""
+    lengths = {
+        length for (length,) in conn.execute("SELECT DISTINCT length FROM words")
+    }
+    stored = {
+        length
+        for (length,) in conn.execute(
+            "SELECT length FROM letter_stats WHERE language_code = ?", (code,)
+        )
+    }
+    return sorted(lengths - stored)
+
+
+def refresh_letter_stats(conn, force=False):
+    """Recompute and store the stats of stale lengths (all lengths with force).
+
+    Returns the lengths that were recomputed. The caller commits. Nothing is
+    done if the database has no letter_stats table.
+    """
+    if not has_letter_stats(conn):
+        return []
+    code = language_code(conn)
+    if force:
+        conn.execute("DELETE FROM letter_stats WHERE language_code = ?", (code,))
+    lengths = stale_lengths(conn, code)
+    if not lengths:
+        return []
+
+    words = {length: [] for length in lengths}
+    cursor = conn.execute(
+        f"""
+        SELECT length, word FROM words
+        WHERE length IN ({','.join('?' * len(lengths))})
+        """,
+        lengths,
+    )
+    for length, word in cursor:
+        words[length].append(word)
+
+    updated = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    rows = []
+    for length in lengths:
+        stats = count_letters(words[length], length)
+        rows.append(
+            (
+                code,
+                length,
+                stats["word_count"],
+                json.dumps(stats["letters"], ensure_ascii=False),
+                json.dumps(stats["positions"], ensure_ascii=False),
+                json.dumps(stats["bigrams"], ensure_ascii=False),
+                updated,
+            )
+        )
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO letter_stats
+            (language_code, length, word_count, letters, positions, bigrams, updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return lengths
+
+
+def load_letter_stats(conn, length, refresh=True):
+    """Return the stats of one word length, or None if there are no such words.
+
+    With refresh, stale stats are recomputed and committed first. Returns
+    None as well if the database has no letter_stats table.
+    """
+    if not has_letter_stats(conn):
+        return None
+    if refresh:
+        if refresh_letter_stats(conn):
+            conn.commit()
+    row = conn.execute(LOAD_SQL, (language_code(conn), length)).fetchone()
+    if row is None:
+        return None
+    word_count, letters, positions, bigrams = row
+    return {
+        "word_count": word_count,
+        "letters": json.loads(letters),
+        "positions": json.loads(positions),
+        "bigrams": json.loads(bigrams),
+    }
+
+
+def letter_totals(conn, refresh=True):
+    """Return a Counter of letters over the words of every length.
+
+    Returns None if the database has no letter_stats table.
+    """
+    if not has_letter_stats(conn):
+        return None
+    if refresh:
+        if refresh_letter_stats(conn):
+            conn.commit()
+    totals = Counter()
+    for (letters,) in conn.execute(
+        "SELECT letters FROM letter_stats WHERE language_code = ?",
+        (language_code(conn),),
+    ):
+        totals.update(json.loads(letters))
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute and show cached letter statistics per word length."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--length", type=int, default=5, help="Word length to show (default: 5)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Recompute the stats of every length"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Entries shown per table (default: 10)"
+    )
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db or os.path.join("es_data", "es.db"))
+    if not has_letter_stats(conn):
+        conn.close()
+        print("Error: no letter_stats table; run migrate_schema.py first")
+        sys.exit(1)
+    try:
+        start = time.perf_counter()
+        lengths = refresh_letter_stats(conn, args.force)
+        conn.commit()
+        if lengths:
+            elapsed = time.perf_counter() - start
+            print(f"Computed stats for lengths {lengths} in {elapsed:.3f}s")
+
+        start = time.perf_counter()
+        stats = load_letter_stats(conn, args.length, refresh=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    if stats is None:
+        print(f"No words of length {args.length}")
+    else:
+        print(
+            f"{stats['word_count']} words of length {args.length} "
+            f"(loaded in {elapsed * 1000:.2f}ms)"
+        )
+        letters = Counter(stats["letters"]).most_common(args.top)
+        print("Letters: " + ", ".join(f"{c} {n}" for c, n in letters))
+        for position, counts in enumerate(stats["positions"], 1):
+            common = Counter(counts).most_common(args.top)
+            print(f"Position {position}: " + ", ".join(f"{c} {n}" for c, n in common))
+        bigrams = Counter(stats["bigrams"]).most_common(args.top)
+        print("Bigrams: " + ", ".join(f"{c} {n}" for c, n in bigrams))
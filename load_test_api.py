@@ -0,0 +1,152 @@
+"""Load test for word_server.py reporting request latency percentiles.
+
+Opens concurrent keep-alive connections and sends a mix of word lookups,
+list queries and random-word requests. With --db, a server is started in
+the same process on a free port, so no separate service is needed:
+
+    python load_test_api.py --db es_data/es.db --requests 20000 --concurrency 32
+    python load_test_api.py --port 8080 --requests 5000
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import time
+from urllib.parse import quote
+
+from word_server import start_server
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def request_targets(db_path, count, seed=0):
+    """Return count request paths, mostly lookups of known and unknown words."""
+    conn = sqlite3.connect(db_path)
+    try:
+        words = [row[0] for row in conn.execute("SELECT word FROM words")]
+    finally:
+        conn.close()
+    rng = random.Random(seed)
+    targets = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.7 and words:
+            targets.append(f"/words/{quote(rng.choice(words))}")
+        elif roll < 0.8:
+            targets.append(f"/words/zz{rng.randrange(100000)}")
+        elif roll < 0.9:
+            targets.append(f"/words?length=5&level={rng.randint(0, 10)}&limit=50")
+        else:
+            targets.append("/random?length=5")
+    return targets
+
+
+async def client(host, port, targets, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for target in targets:
+            started = time.perf_counter()
+            writer.write(
+                f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("utf-8")
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError(f"server closed the connection on {target}")
+            length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if status_line.split()[1] not in (b"200", b"404"):
+                errors.append(status_line)
+    finally:
+        writer.close()
+
+
+async def run_load_test(host, port, targets, concurrency):
+    latencies = []
+    errors = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(host, port, targets[i::concurrency], latencies, errors)
+            for i in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+async def main(args):
+    host, port = args.host, args.port
+    server = None
+    if args.db:
+        server, _ = await start_server(
+            args.db, host, 0, args.pool_size, cache_ttl=args.cache_ttl
+        )
+        port = server.sockets[0].getsockname()[1]
+
+    targets = request_targets(args.targets_db or args.db, args.requests, args.seed)
+    try:
+        latencies, errors, elapsed = await run_load_test(
+            host, port, targets, args.concurrency
+        )
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    latencies.sort()
+    print(
+        f"{len(latencies)} requests in {elapsed:.2f}s "
+        f"({len(latencies) / elapsed:.0f} req/s, concurrency {args.concurrency})"
+    )
+    print(
+        f"p50 {percentile(latencies, 0.50) * 1000:.2f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, "
+        f"max {latencies[-1] * 1000:.2f} ms"
+    )
+    if errors:
+        print(f"{len(errors)} requests failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure word_server.py latency under concurrent load."
+    )
+    parser.add_argument(
+        "--db", help="Start an in-process server on this database (default: none)"
+    )
+    parser.add_argument(
+        "--targets-db",
+        help="Database to draw lookup words from when testing a running server",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=300.0,
+        help="Response cache TTL of the in-process server; 0 disables caching",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not (args.db or args.targets_db):
+        parser.error("--db or --targets-db is required")
+
+    asyncio.run(main(args))
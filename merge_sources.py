@@ -0,0 +1,317 @@
+"""Merge word lists from several sources into the words table.
+
+Every input CSV (word, translation, length columns) is read in one pass and
+joined in memory against the existing words on the word text. When sources
+disagree, the row from the highest-priority source provides the length,
+translation and words.source; a missing translation is filled from the next
+source that has one, and a stored translation is never blanked. Every source a word appears in is recorded in the
+word_sources link table, and the priority is stored in sources.priority, so
+loading order no longer decides which source wins and a new source can be
+merged in on its own at any time.
+
+All changes are written in a single transaction.
+"""
+
+import argparse
+import sqlite3
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+import pipeline_stats
+from import_ivan_words import RejectWriter, configure_bulk_load, read_rows, validate_row
+from normalize_words import ensure_normalized_column, fold_enye_rule, normalize_word
+from translation_search import bulk_translation_load
+
+
+def ensure_word_sources(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS word_sources (
+            word_id INTEGER NOT NULL,
+            source_id INTEGER NOT NULL,
+            PRIMARY KEY (word_id, source_id),
+            FOREIGN KEY (word_id) REFERENCES words(word_id),
+            FOREIGN KEY (source_id) REFERENCES sources(source_id)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def ensure_source_priority(conn):
+    """Add sources.priority (lower is more trusted, NULL is unranked) if missing."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sources)")}
+    if "priority" not in columns:
+        conn.execute("ALTER TABLE sources ADD COLUMN priority INTEGER")
+
+
+def store_priority(conn, priority):
+    """Store priority (short names, most trusted first) in place of the old one."""
+    conn.execute("UPDATE sources SET priority = NULL")
+    conn.executemany(
+        "UPDATE sources SET priority = ? WHERE short_name = ?",
+        [(rank, source) for rank, source in enumerate(priority)],
+    )
+
+
+def source_order(conn, inputs):
+    """Return every source short name, most trusted first.
+
+    Sources with a stored priority come first, then the remaining inputs in
+    the order given, then every other source.
+    """
+    order = [
+        source
+        for (source,) in conn.execute(
+            """
+            SELECT short_name FROM sources
+            WHERE priority IS NOT NULL
+            ORDER BY priority, source_id
+            """
+        )
+    ]
+    for source, _ in inputs:
+        if source not in order:
+            order.append(source)
+    for (source,) in conn.execute("SELECT short_name FROM sources ORDER BY source_id"):
+        if source not in order:
+            order.append(source)
+    return order
+
+
+def parse_input(text):
+    """Parse a SOURCE:CSV command line argument."""
+    source, sep, csv_path = text.partition(":")
+    if not sep or len(source) != 4 or not csv_path:
+        raise argparse.ArgumentTypeError(
+            f"expected SOURCE:CSV with a 4-character source, got '{text}'"
+        )
+    return source, csv_path
+
+
+def read_sources(inputs, rejects_suffix=".rejected.csv"):
+    """Read every (source, csv_path) input into {word: {source: (translation, length)}}.
+
+    Invalid rows and repeated words within one file are written next to it,
+    to <csv stem><rejects_suffix>. Returns (candidates, rows_read, rejected).
+    """
+    candidates = {}
+    rows_read = 0
+    rejected = 0
+    for source, csv_path in inputs:
+        csv_path = Path(csv_path)
+        rejects = RejectWriter(csv_path.with_suffix(rejects_suffix))
+        seen = set()
+        try:
+            for line_number, row in read_rows(csv_path):
+                rows_read += 1
+                values, reason = validate_row(row)
+                if reason is None and values[0] in seen:
+                    reason = "duplicate word in input"
+                if reason is not None:
+                    rejects.write(line_number, row, reason)
+                    continue
+                word, translation, length = values
+                seen.add(word)
+                candidates.setdefault(word, {})[source] = (translation, length)
+        finally:
+            rejects.close()
+        rejected += rejects.count
+    return candidates, rows_read, rejected
+
+
+def resolve(by_source, rank):
+    """Pick (translation, length, source) for one word from its source rows."""
+    ordered = sorted(by_source, key=rank)
+    best = ordered[0]
+    translation, length = by_source[best]
+    if not translation:
+        translation = next((by_source[s][0] for s in ordered if by_source[s][0]), "")
+    return translation, length, best
+
+
+def merge_sources(inputs, db_path=None, priority=None, rejects_suffix=".rejected.csv"):
+    """Merge [(source, csv_path), ...] into the words table.
+
+    priority lists source short names from most to least trusted and
+    replaces the priority stored in the sources table; without it the stored
+    priority is used (see source_order). A word that is already stored keeps
+    its data unless a higher-priority source, or its own source, provides it.
+    Returns a dict of counts.
+    """
+    db_path = db_path or str(Path(__file__).parent / "es_data/es.db")
+    stats = pipeline_stats.get()
+    start = time.perf_counter()
+
+    with stats.stage("read") as stage:
+        candidates, rows_read, rejected = read_sources(inputs, rejects_suffix)
+        stage.rows += rows_read
+        stage.errors += rejected
+
+    conn = stats.track(sqlite3.connect(db_path))
+    try:
+        configure_bulk_load(conn)
+        ensure_normalized_column(conn)
+        ensure_word_sources(conn)
+        ensure_source_priority(conn)
+        fold_enye = fold_enye_rule(conn)
+
+        source_ids = dict(conn.execute("SELECT short_name, source_id FROM sources"))
+        named = {source for source, _ in inputs} | set(priority or [])
+        unknown = sorted(named - source_ids.keys())
+        if unknown:
+            raise ValueError(
+                f"Unknown source(s) {', '.join(unknown)}; add them to the sources table first"
+            )
+        if priority:
+            store_priority(conn, priority)
+        order = source_order(conn, inputs)
+
+        def rank(source):
+            return order.index(source) if source in order else len(order)
+
+        # Hash join against the current table: word -> (source, translation, length)
+        with stats.stage("join") as stage:
+            existing = {
+                word: (source, translation, length)
+                for word, source, translation, length in conn.execute(
+                    "SELECT word, source, en_translation, length FROM words"
+                )
+            }
+            inserts = []
+            updates = []
+            links = []
+            for word, by_source in candidates.items():
+                translation, length, source = resolve(by_source, rank)
+                links.extend((word, source_ids[s]) for s in by_source)
+                normalized = normalize_word(word, fold_enye)
+                current = existing.get(word)
+                if current is None:
+                    inserts.append((word, translation, length, source, normalized))
+                    continue
+                current_source, current_translation, current_length = current
+                if rank(source) > rank(current_source):
+                    # The stored row wins; only fill in a missing translation
+                    if current_translation or not translation:
+                        continue
+                    source, length = current_source, current_length
+                elif not translation:
+                    # No source has a translation; never blank out the stored one
+                    translation = current_translation
+                if (source, translation, length) != current:
+                    updates.append((word, translation, length, source, normalized))
+            stage.rows += len(candidates)
+
+        with stats.stage("write") as stage:
+            conn.execute(
+                """
+                CREATE TEMP TABLE merged_words (
+                    word TEXT PRIMARY KEY,
+                    en_translation TEXT,
+                    length INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    normalized_word TEXT
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TEMP TABLE merged_links (
+                    word TEXT NOT NULL,
+                    source_id INTEGER NOT NULL
+                )
+                """
+            )
+            # words_fts is rebuilt once after the writes instead of per row
+            translations = (
+                bulk_translation_load(conn) if inserts or updates else nullcontext()
+            )
+            with translations:
+                conn.executemany(
+                    """
+                    INSERT INTO words
+                        (word, en_translation, length, frequency, level, source, normalized_word)
+                    VALUES (?, ?, ?, 0, 0, ?, ?)
+                    """,
+                    inserts,
+                )
+                conn.executemany(
+                    "INSERT INTO merged_words VALUES (?, ?, ?, ?, ?)", updates
+                )
+                conn.execute(
+                    """
+                    UPDATE words
+                    SET en_translation = m.en_translation,
+                        length = m.length,
+                        source = m.source,
+                        normalized_word = m.normalized_word
+                    FROM merged_words m
+                    WHERE words.word = m.word
+                    """
+                )
+            conn.executemany("INSERT INTO merged_links VALUES (?, ?)", links)
+            # Stored words keep a link to the source they were loaded from
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO word_sources (word_id, source_id)
+                SELECT w.word_id, s.source_id
+                FROM words w JOIN sources s ON s.short_name = w.source
+                """
+            )
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO word_sources (word_id, source_id)
+                SELECT w.word_id, l.source_id
+                FROM merged_links l JOIN words w ON w.word = l.word
+                """
+            )
+            stage.rows += len(inserts) + len(updates)
+        with stats.stage("commit"):
+            conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Merged {len(candidates)} words from {len(inputs)} source file(s) in "
+        f"{elapsed:.2f}s: {len(inserts)} inserted, {len(updates)} updated, "
+        f"{rejected} of {rows_read} rows rejected"
+    )
+    return {
+        "words": len(candidates),
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "rejected": rejected,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge word lists from several sources, resolving conflicts by source priority."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        type=parse_input,
+        metavar="SOURCE:CSV",
+        help="Source short name and CSV file, e.g. ivan:es_data/es_en_5.csv",
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--priority",
+        type=lambda s: s.split(","),
+        help="Comma separated source short names, most trusted first; stored "
+        "in the sources table (default: the stored priority, then the order "
+        "of the inputs)",
+    )
+    pipeline_stats.add_arguments(parser)
+    args = parser.parse_args()
+
+    pipeline_stats.run_with_args(
+        args,
+        "merge_sources",
+        merge_sources,
+        args.inputs,
+        args.db,
+        args.priority,
+    )
@@ -0,0 +1,340 @@
+"""Versioned, in-place schema upgrades for existing language databases.
+
+The schema version is stored in the database header (PRAGMA user_version).
+Each migration adds columns, tables or indexes in place; data backfills run
+in chunks of word_id ranges, one short transaction per chunk, so a large
+database is never copied or locked for the whole backfill. Migrations are
+idempotent, so a run that is interrupted can simply be repeated.
+
+A database created by createEsWordDB.py starts at SCHEMA_VERSION. Version 0
+covers both databases created before versioning and those created by
+old_files/createWordDB.py (isAnswer, rootWord and word_sources, without
+frequency and source columns); both are brought up to date.
+
+To add a migration, write a function taking (conn, chunk_size) and append
+it to MIGRATIONS; its version is its position in the list.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+from letter_stats import ensure_letter_stats
+from merge_sources import ensure_source_priority, ensure_word_sources
+from normalize_words import (
+    ensure_normalization_rule,
+    ensure_normalized_column,
+    fold_enye_rule,
+    normalize_word,
+)
+from translation_search import (
+    create_translation_triggers,
+    ensure_translation_index,
+    has_translation_index,
+)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# The length/level filters of the exporters, schedule and lookup API, and
+# the lookup API's ORDER BY word within one length and level
+READ_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_words_length_level_word
+ON words(length, level, word)
+"""
+
+
+def columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def backfill(conn, sql, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Run an UPDATE/INSERT over words in word_id ranges, committing each range.
+
+    sql must filter on "word_id BETWEEN ? AND ?". Returns the rows changed.
+    """
+    max_id = conn.execute("SELECT MAX(word_id) FROM words").fetchone()[0] or 0
+    changed = 0
+    for low in range(0, max_id + 1, chunk_size):
+        conn.execute("BEGIN")
+        changed += conn.execute(sql, (low, low + chunk_size - 1)).rowcount
+        conn.execute("COMMIT")
+    return changed
+
+
+def add_word_columns(conn, chunk_size):
+    """Columns, tables and indexes missing from old_files/createWordDB.py databases."""
+    existing = columns(conn, "words")
+    conn.execute("BEGIN")
+    if "frequency" not in existing:
+        conn.execute("ALTER TABLE words ADD COLUMN frequency REAL")
+    if "categories" not in existing:
+        conn.execute("ALTER TABLE words ADD COLUMN categories TEXT")
+    if "source" not in existing:
+        conn.execute(
+            "ALTER TABLE words ADD COLUMN source TEXT REFERENCES sources(short_name)"
+        )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS edits (
+            edit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            word TEXT NOT NULL,
+            change_description TEXT NOT NULL,
+            author TEXT NOT NULL,
+            FOREIGN KEY (word) REFERENCES words(word)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_length ON words(length)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_level ON words(level)")
+    conn.execute("COMMIT")
+
+    if "source" not in existing:
+        # Old databases linked words to sources only through word_sources
+        has_links = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'word_sources'"
+        ).fetchone()
+        linked_source = (
+            """
+            (SELECT s.short_name
+             FROM word_sources ws JOIN sources s ON s.source_id = ws.source_id
+             WHERE ws.word_id = words.word_id
+             ORDER BY ws.source_id LIMIT 1)
+            """
+            if has_links
+            else "NULL"
+        )
+        backfill(
+            conn,
+            f"""
+            UPDATE words SET source = COALESCE({linked_source}, 'self')
+            WHERE source IS NULL AND word_id BETWEEN ? AND ?
+            """,
+            chunk_size,
+        )
+
+
+def add_normalized_word(conn, chunk_size):
+    conn.execute("BEGIN")
+    ensure_normalized_column(conn)
+    conn.execute("COMMIT")
+
+    fold_enye = fold_enye_rule(conn)
+    conn.create_function(
+        "normalize_word",
+        1,
+        lambda word: normalize_word(word, fold_enye),
+        deterministic=True,
+    )
+    backfill(
+        conn,
+        """
+        UPDATE words SET normalized_word = normalize_word(word)
+        WHERE normalized_word IS NULL AND word_id BETWEEN ? AND ?
+        """,
+        chunk_size,
+    )
+
+
+def add_word_sources(conn, chunk_size):
+    ensure_word_sources(conn)
+    backfill(
+        conn,
+        """
+        INSERT OR IGNORE INTO word_sources (word_id, source_id)
+        SELECT w.word_id, s.source_id
+        FROM words w JOIN sources s ON s.short_name = w.source
+        WHERE w.word_id BETWEEN ? AND ?
+        """,
+        chunk_size,
+    )
+
+
+def add_translation_search(conn, chunk_size):
+    # The FTS index is filled with one 'rebuild' pass, which is far cheaper
+    # than the per-row trigger path
+    conn.execute("BEGIN")
+    ensure_translation_index(conn)
+    conn.execute("COMMIT")
+
+
+def add_read_indexes(conn, chunk_size):
+    conn.execute("BEGIN")
+    conn.execute(READ_INDEX)
+    conn.execute("COMMIT")
+
+
+def add_lemma_column(conn, chunk_size):
+    # Filled by lemmatize_words.py, which needs the frequency list and only
+    # fills rows that do not have a lemma yet
+    conn.execute("BEGIN")
+    if "lemma" not in columns(conn, "words"):
+        conn.execute("ALTER TABLE words ADD COLUMN lemma TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lemma ON words(lemma)")
+    conn.execute("COMMIT")
+
+    if "rootWord" in columns(conn, "words"):
+        # old_files/createWordDB.py databases keep hand-curated roots here
+        backfill(
+            conn,
+            """
+            UPDATE words SET lemma = TRIM(rootWord)
+            WHERE lemma IS NULL AND TRIM(rootWord) != ''
+              AND word_id BETWEEN ? AND ?
+            """,
+            chunk_size,
+        )
+
+
+def add_letter_stats(conn, chunk_size):
+    # Starts empty; each length is computed the first time it is read
+    conn.execute("BEGIN")
+    ensure_letter_stats(conn)
+    conn.execute("COMMIT")
+
+
+def add_normalization_rule(conn, chunk_size):
+    # Existing databases were normalized without folding "ñ", the default
+    conn.execute("BEGIN")
+    ensure_normalization_rule(conn)
+    conn.execute("COMMIT")
+
+
+def add_source_priority(conn, chunk_size):
+    # Unranked until merge_sources.py --priority stores an order
+    conn.execute("BEGIN")
+    ensure_source_priority(conn)
+    conn.execute("COMMIT")
+
+
+def add_translation_update_guard(conn, chunk_size):
+    # Recreated so an UPDATE that keeps the translation skips the FTS index
+    conn.execute("BEGIN")
+    if has_translation_index(conn):
+        conn.execute("DROP TRIGGER IF EXISTS words_fts_update")
+        create_translation_triggers(conn)
+    conn.execute("COMMIT")
+
+
+def narrow_read_index(conn, chunk_size):
+    # Replaces idx_words_length_level, which also copied frequency and the
+    # translation into the index without any query sorting on them
+    conn.execute("BEGIN")
+    conn.execute("DROP INDEX IF EXISTS idx_words_length_level")
+    conn.execute(READ_INDEX)
+    conn.execute("COMMIT")
+
+
+# Version n is reached by applying MIGRATIONS[n - 1]
+MIGRATIONS = [
+    add_word_columns,
+    add_normalized_word,
+    add_word_sources,
+    add_translation_search,
+    add_read_indexes,
+    add_lemma_column,
+    add_letter_stats,
+    add_normalization_rule,
+    add_source_priority,
+    add_translation_update_guard,
+    narrow_read_index,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def set_schema_version(conn, version):
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def pending_migrations(conn, target=SCHEMA_VERSION):
+    """Return [(version, migration), ...] still to apply to reach target."""
+    current = schema_version(conn)
+    return [
+        (version, MIGRATIONS[version - 1]) for version in range(current + 1, target + 1)
+    ]
+
+
+def migrate(db_path, target=SCHEMA_VERSION, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Apply pending migrations to db_path in order. Returns the new version."""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    if target > SCHEMA_VERSION:
+        raise ValueError(f"Unknown schema version {target} (latest {SCHEMA_VERSION})")
+
+    # Transactions are managed explicitly, one per step or backfill chunk
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        current = schema_version(conn)
+        if current > SCHEMA_VERSION:
+            raise ValueError(
+                f"{db_path} is at schema version {current}, newer than this code "
+                f"({SCHEMA_VERSION})"
+            )
+        for version, migration in pending_migrations(conn, target):
+            print(f"{db_path}: applying {version} {migration.__name__}")
+            migration(conn, chunk_size)
+            set_schema_version(conn, version)
+            current = version
+    finally:
+        conn.close()
+
+    return current
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Upgrade language databases to the current schema in place."
+    )
+    parser.add_argument(
+        "databases",
+        nargs="*",
+        default=[os.path.join("es_data", "es.db")],
+        help="Databases to upgrade (default: es_data/es.db)",
+    )
+    parser.add_argument(
+        "--target",
+        type=int,
+        default=SCHEMA_VERSION,
+        help=f"Schema version to upgrade to (default: {SCHEMA_VERSION})",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows per backfill transaction",
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Only report each database's version and pending migrations",
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    for db_path in args.databases:
+        try:
+            if args.status:
+                if not os.path.exists(db_path):
+                    raise FileNotFoundError(f"Database not found: {db_path}")
+                conn = sqlite3.connect(db_path)
+                pending = pending_migrations(conn, args.target)
+                print(
+                    f"{db_path}: version {schema_version(conn)}, "
+                    f"{len(pending)} pending migration(s)"
+                )
+                conn.close()
+            else:
+                version = migrate(db_path, args.target, args.chunk_size)
+                print(f"{db_path}: at schema version {version}")
+        except (OSError, ValueError, sqlite3.Error) as e:
+            failures += 1
+            print(f"Error migrating {db_path}: {e}")
+
+    if failures:
+        sys.exit(1)
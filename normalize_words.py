@@ -0,0 +1,167 @@
+import argparse
+import os
+import sqlite3
+import sys
+import unicodedata
+
+# Spanish treats ñ as its own letter, so by default it survives folding;
+# pass fold_enye=True to match players who type "n" for "ñ"
+ENYE = "ñ"
+
+FIND_WORDS_SQL = """
+    SELECT word, en_translation
+    FROM words
+    WHERE normalized_word = ?
+    ORDER BY word
+    """
+
+
+def normalize_word(word, fold_enye=False):
+    """Lowercase word and strip accents, e.g. "Está" -> "esta".
+
+    ñ is kept unless fold_enye is True.
+    """
+    # Compose first so a decomposed "n" + combining tilde is seen as "ñ"
+    word = unicodedata.normalize("NFC", word).lower()
+    if not fold_enye:
+        parts = word.split(ENYE)
+        return ENYE.join(normalize_word(part, fold_enye=True) for part in parts)
+    decomposed = unicodedata.normalize("NFD", word)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def ensure_normalized_column(conn):
+    """Add the normalized_word column and its index if they are missing.
+
+    Returns True if the column was added.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(words)")}
+    added = False
+    if "normalized_word" not in columns:
+        conn.execute("ALTER TABLE words ADD COLUMN normalized_word TEXT")
+        added = True
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_normalized_word ON words(normalized_word)"
+    )
+    return added
+
+
+def ensure_normalization_rule(conn):
+    """Add language_info.fold_enye, the rule normalized_word is built with.
+
+    Returns True if the column was added.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(language_info)")}
+    if "fold_enye" in columns:
+        return False
+    conn.execute(
+        "ALTER TABLE language_info ADD COLUMN fold_enye INTEGER NOT NULL DEFAULT 0"
+    )
+    return True
+
+
+def fold_enye_rule(conn):
+    """Return whether this database's normalized_word folds "ñ" to "n".
+
+    Databases without the rule column were always built without folding.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(language_info)")}
+    if "fold_enye" not in columns:
+        return False
+    row = conn.execute("SELECT fold_enye FROM language_info").fetchone()
+    return bool(row and row[0])
+
+
+def backfill_normalized_words(conn, fold_enye=False, only_missing=True):
+    """Fill normalized_word for existing rows with one UPDATE.
+
+    Returns the number of rows updated.
+    """
+    conn.create_function(
+        "normalize_word",
+        1,
+        lambda word: normalize_word(word, fold_enye),
+        deterministic=True,
+    )
+    where = "WHERE normalized_word IS NULL" if only_missing else ""
+    cursor = conn.execute(
+        f"UPDATE words SET normalized_word = normalize_word(word) {where}"
+    )
+    return cursor.rowcount
+
+
+def find_words(conn, text):
+    """Return (word, en_translation) rows whose normalized form matches text.
+
+    text is normalized with the database's own fold_enye rule. Uses
+    idx_normalized_word, so no rows are normalized at query time.
+    """
+    cursor = conn.execute(FIND_WORDS_SQL, (normalize_word(text, fold_enye_rule(conn)),))
+    return cursor.fetchall()
+
+
+def normalize_database(db_path=None, fold_enye=None, rebuild=False):
+    """Fill normalized_word; fold_enye=None keeps the database's stored rule.
+
+    Changing the rule requires rebuild, since rows normalized with the old
+    rule would otherwise no longer match lookups.
+    """
+    db_path = db_path or os.path.join("es_data", "es.db")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_normalized_column(conn)
+        ensure_normalization_rule(conn)
+        stored = fold_enye_rule(conn)
+        if fold_enye is None:
+            fold_enye = stored
+        elif fold_enye != stored and not rebuild:
+            normalized = conn.execute(
+                "SELECT 1 FROM words WHERE normalized_word IS NOT NULL LIMIT 1"
+            ).fetchone()
+            if normalized:
+                raise ValueError(
+                    f"normalized_word was built with fold_enye={stored}; "
+                    "pass --rebuild to change the rule"
+                )
+        conn.execute("UPDATE language_info SET fold_enye = ?", (int(fold_enye),))
+        updated = backfill_normalized_words(conn, fold_enye, only_missing=not rebuild)
+        conn.commit()
+    finally:
+        conn.close()
+
+    print(f"Normalized {updated} words in {db_path}")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Add and fill the accent-folded normalized_word column."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    rule = parser.add_mutually_exclusive_group()
+    rule.add_argument(
+        "--fold-enye",
+        action="store_const",
+        const=True,
+        help='Fold "ñ" to "n" as well (stored as the database\'s rule)',
+    )
+    rule.add_argument(
+        "--keep-enye",
+        dest="fold_enye",
+        action="store_const",
+        const=False,
+        help='Keep "ñ" (the default for new databases)',
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute every row, not just rows without a normalized form",
+    )
+    args = parser.parse_args()
+
+    try:
+        normalize_database(args.db, args.fold_enye, args.rebuild)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
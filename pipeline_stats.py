@@ -0,0 +1,207 @@
+"""Optional per-stage instrumentation for the word pipeline scripts.
+
+Scripts wrap their work in stages:
+
+    stats = pipeline_stats.get()
+    with stats.stage("insert") as stage:
+        cursor.executemany(...)
+        stage.rows += len(batch)
+
+and call stats.track(conn) on their SQLite connections so that statements
+are counted against the stage that runs them. When instrumentation is off
+(the default) get() returns a stub whose stage() and track() do nothing.
+
+Scripts expose it through add_arguments(parser) and run_with_args(args, ...):
+--stats writes one JSON line per stage (to a file, or "-" for stderr) and
+--profile dumps a cProfile report for the whole run.
+"""
+
+import cProfile
+import json
+import pstats
+import sys
+import time
+
+
+class Stage:
+    __slots__ = ("name", "seconds", "calls", "rows", "errors", "statements")
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.errors = 0
+        self.statements = 0
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "seconds": round(self.seconds, 6),
+            "calls": self.calls,
+            "rows": self.rows,
+            "errors": self.errors,
+            "statements": self.statements,
+        }
+
+
+class _StageTimer:
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+        self.previous = None
+        self.start = 0.0
+
+    def __enter__(self):
+        self.previous = self.stats.current
+        self.stats.current = self.stage
+        self.start = time.perf_counter()
+        return self.stage
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stage.seconds += time.perf_counter() - self.start
+        self.stage.calls += 1
+        if exc_type is not None:
+            self.stage.errors += 1
+        self.stats.current = self.previous
+        return False
+
+
+class PipelineStats:
+    """Collects stage timings, row/error counts and SQLite statement counts."""
+
+    enabled = True
+
+    def __init__(self, script, output="-", profile_path=None):
+        self.script = script
+        self.output = output
+        self.profile_path = profile_path
+        self.stages = {}
+        self.current = None
+        self.statements = 0
+        self.start = time.perf_counter()
+        self.profiler = None
+        if profile_path:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stage(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage(name)
+        return _StageTimer(self, stage)
+
+    def _count_statement(self, statement):
+        self.statements += 1
+        if self.current is not None:
+            self.current.statements += 1
+
+    def track(self, conn):
+        """Count every statement conn executes against the current stage."""
+        conn.set_trace_callback(self._count_statement)
+        return conn
+
+    def finish(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_path)
+            report = pstats.Stats(self.profiler, stream=sys.stderr)
+            report.sort_stats("cumulative").print_stats(20)
+            print(f"cProfile data written to {self.profile_path}", file=sys.stderr)
+
+        if self.output is None:
+            return
+        lines = [
+            dict(script=self.script, **stage.as_dict())
+            for stage in self.stages.values()
+        ]
+        lines.append(
+            {
+                "script": self.script,
+                "stage": "total",
+                "seconds": round(time.perf_counter() - self.start, 6),
+                "statements": self.statements,
+            }
+        )
+        text = "".join(json.dumps(line) + "\n" for line in lines)
+        if self.output == "-":
+            sys.stderr.write(text)
+        else:
+            with open(self.output, "a", encoding="utf-8") as f:
+                f.write(text)
+
+
+class _NullStage:
+    __slots__ = ()
+    rows = errors = statements = 0
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class NullStats:
+    """Stand-in used when instrumentation is off; every method is a no-op."""
+
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name):
+        return self._stage
+
+    def track(self, conn):
+        return conn
+
+    def finish(self):
+        pass
+
+
+_active = NullStats()
+
+
+def get():
+    """Return the active instrumentation, or the no-op stub when it is off."""
+    return _active
+
+
+def configure(script, output=None, profile_path=None):
+    """Turn instrumentation on for this process."""
+    global _active
+    if output is None and profile_path is None:
+        _active = NullStats()
+    else:
+        _active = PipelineStats(script, output, profile_path)
+    return _active
+
+
+def finish():
+    global _active
+    _active.finish()
+    _active = NullStats()
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="Write per-stage timings as JSON lines to FILE (default: stderr)",
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE", help="Dump a cProfile report to FILE"
+    )
+
+
+def run_with_args(args, script, func, *func_args, **func_kwargs):
+    """Run func with instrumentation configured from --stats/--profile."""
+    configure(script, args.stats, args.profile)
+    try:
+        return func(*func_args, **func_kwargs)
+    finally:
+        finish()
@@ -0,0 +1,197 @@
+"""Publish a read-only, versioned snapshot of a language database for deployment.
+
+The working database carries data only the build tools need (the edits
+history, build_state/build_rows, word_sources) and the triggers that keep
+words_fts and letter_stats in sync. A snapshot is a VACUUM INTO copy with
+all of that removed. It also gets:
+
+- the read indexes and fully computed letter stats
+- a merged FTS index
+- the requested page size, in rollback journal mode so readers can open it
+  immutable and memory-mapped (see word_server.py)
+- fresh ANALYZE statistics
+
+Every registered query plan is checked against it. The file is written as
+<code>-<version>.db with a <code>-<version>.json manifest next to it, which
+holds the SHA-256, size, schema version and row count of every table.
+Snapshots are never overwritten; publish a new version instead.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import stat
+import sys
+from datetime import datetime, timezone
+
+from build_state import file_hash
+from letter_stats import refresh_letter_stats
+from migrate_schema import READ_INDEX, SCHEMA_VERSION, schema_version
+from query_plans import check_plans
+
+# Matches the usual OS page, so memory-mapped pages line up with the file
+DEFAULT_PAGE_SIZE = 4096
+
+# Tables only the build and editing tools use
+WRITE_ONLY_TABLES = ("edits", "build_state", "build_rows", "word_sources")
+
+
+def table_names(conn):
+    """Return the user tables of conn, leaving out FTS shadow tables."""
+    rows = conn.execute(
+        """
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY name
+        """
+    ).fetchall()
+    virtual = [name for name, sql in rows if sql.startswith("CREATE VIRTUAL")]
+    return [
+        name for name, _ in rows if not any(name.startswith(f"{v}_") for v in virtual)
+    ]
+
+
+def row_counts(conn):
+    return {
+        name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+        for name in table_names(conn)
+    }
+
+
+def prepare_snapshot(conn, page_size=DEFAULT_PAGE_SIZE):
+    """Turn a fresh copy of a language database into a read-only snapshot."""
+    tables = set(table_names(conn))
+    # Fill letter_stats while its triggers still exist, then freeze it
+    if "letter_stats" in tables:
+        refresh_letter_stats(conn, force=True)
+    if "words_fts" in tables:
+        conn.execute("INSERT INTO words_fts (words_fts) VALUES ('optimize')")
+
+    triggers = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+    ).fetchall()
+    for (name,) in triggers:
+        conn.execute(f'DROP TRIGGER "{name}"')
+    for name in WRITE_ONLY_TABLES:
+        conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    conn.execute(READ_INDEX)
+    conn.commit()
+
+    # A new page size only takes effect through VACUUM, outside WAL mode
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute(f"PRAGMA page_size = {int(page_size)}")
+    conn.execute("VACUUM")
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def publish_snapshot(
+    db_path=None,
+    output_dir=None,
+    version=None,
+    page_size=DEFAULT_PAGE_SIZE,
+):
+    """Write <code>-<version>.db and its manifest to output_dir.
+
+    Returns the manifest as a dict.
+    """
+    db_path = db_path or os.path.join("es_data", "es.db")
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+
+    source = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        current = schema_version(source)
+        if current != SCHEMA_VERSION:
+            raise ValueError(
+                f"{db_path} is at schema version {current}, not {SCHEMA_VERSION}; "
+                "run migrate_schema.py first"
+            )
+        (language_code,) = source.execute(
+            "SELECT language_code FROM language_info"
+        ).fetchone()
+
+        output_dir = output_dir or os.path.join(os.path.dirname(db_path), "snapshots")
+        os.makedirs(output_dir, exist_ok=True)
+        name = f"{language_code}-{version}"
+        snapshot_path = os.path.join(output_dir, f"{name}.db")
+        manifest_path = os.path.join(output_dir, f"{name}.json")
+        if os.path.exists(snapshot_path) or os.path.exists(manifest_path):
+            raise FileExistsError(f"Snapshot {name} already exists in {output_dir}")
+
+        temp_path = snapshot_path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        source.execute("VACUUM INTO ?", (temp_path,))
+    finally:
+        source.close()
+
+    try:
+        conn = sqlite3.connect(temp_path)
+        try:
+            prepare_snapshot(conn, page_size)
+            failures = check_plans(conn)
+            if failures:
+                raise ValueError(f"{failures} queries do full scans on the snapshot")
+            manifest = {
+                "language_code": language_code,
+                "version": version,
+                "file": os.path.basename(snapshot_path),
+                "schema_version": schema_version(conn),
+                "page_size": conn.execute("PRAGMA page_size").fetchone()[0],
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "source": os.path.basename(db_path),
+                "row_counts": row_counts(conn),
+            }
+        finally:
+            conn.close()
+
+        manifest["bytes"] = os.path.getsize(temp_path)
+        manifest["sha256"] = file_hash(temp_path)
+        # Deployed copies are never written to
+        os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # The manifest is written last, so its presence marks a complete snapshot
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    print(
+        f"Published {snapshot_path} ({manifest['bytes']:,} bytes, "
+        f"{manifest['row_counts'].get('words', 0)} words, "
+        f"{os.path.getsize(db_path):,} bytes before)"
+    )
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Publish a read-only, versioned snapshot of a language database."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--output-dir", help="Snapshot directory (default: snapshots/ next to the db)"
+    )
+    parser.add_argument(
+        "--version", help="Snapshot version (default: current UTC time)"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Page size of the snapshot (default: {DEFAULT_PAGE_SIZE})",
+    )
+    args = parser.parse_args()
+
+    try:
+        publish_snapshot(args.db, args.output_dir, args.version, args.page_size)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error publishing snapshot: {e}")
+        sys.exit(1)
@@ -0,0 +1,230 @@
+"""EXPLAIN QUERY PLAN checks for the queries the tools actually run.
+
+QUERIES registers a representative instance of each read query, named
+after the function that issues it and built from that module's own SQL;
+word_server.py's queries are registered in every filter combination the
+API can send. check_plans() explains each one against a copy of a
+database's schema and flags any full table scan (a SCAN step, even one
+that walks an index), so a missing or unusable index is caught before the
+vocabulary grows large enough for it to show up as latency. Full exports
+that read every word by design are listed in ALLOWED_SCANS. Queries on
+optional tables (anagram_index, daily_words, letter_stats, words_fts) are
+skipped when the table does not exist.
+
+    python query_plans.py [--db es_data/es.db] [--verbose]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+from anagram_index import ANAGRAMS_SQL
+from extract_words import words_query
+from generate_schedule import candidates_query
+from import_ivan_words import EXISTING_WORDS_SQL
+from letter_stats import LOAD_SQL as LETTER_STATS_SQL
+from normalize_words import FIND_WORDS_SQL
+from translation_search import SEARCH_SQL as TRANSLATION_SEARCH_SQL
+from word_server import LOOKUP_SQL, SEARCH_SQL, id_range_query, random_query
+from word_server import words_query as server_words_query
+
+# Every combination of the optional length and level filters that /words
+# and /random accept
+SERVER_FILTERS = [
+    (None, None, "no filters"),
+    (5, None, "length"),
+    (None, 3, "level"),
+    (5, 3, "length, level"),
+]
+
+# (name, sql, sample parameters, tables that must exist); the SQL comes from
+# the modules that run it, so a changed query is checked as it is now
+QUERIES = [
+    (
+        "extract_words.query_words",
+        *words_query([5], [1, 2]),
+        ("words",),
+    ),
+    (
+        "extract_words.query_words (all lengths)",
+        *words_query(),
+        ("words",),
+    ),
+    (
+        "generate_schedule.load_candidates",
+        *candidates_query([5], [1, 2], 0.001),
+        ("words",),
+    ),
+    (
+        "generate_schedule.load_candidates (lemma frequency)",
+        *candidates_query([5], [1, 2], 0.001, lemma_frequency=True),
+        ("words",),
+    ),
+    (
+        "generate_schedule.load_candidates (all words)",
+        *candidates_query(),
+        ("words",),
+    ),
+    (
+        # feedback_engine imports NumPy, so its one query is repeated here
+        "feedback_engine.load_words",
+        "SELECT word FROM words WHERE length = ? ORDER BY word",
+        (5,),
+        ("words",),
+    ),
+    ("word_server.lookup", LOOKUP_SQL, ("abajo",), ("words",)),
+    *[
+        (
+            f"word_server.words ({filters})",
+            *server_words_query(length, level, 100, "perro"),
+            ("words",),
+        )
+        for length, level, filters in SERVER_FILTERS
+    ],
+    *[
+        (
+            f"word_server.id_range ({filters})",
+            *id_range_query(length, level),
+            ("words",),
+        )
+        for length, level, filters in SERVER_FILTERS
+    ],
+    *[
+        (
+            f"word_server.random_word ({filters})",
+            *random_query(length, level, 10),
+            ("words",),
+        )
+        for length, level, filters in SERVER_FILTERS
+    ],
+    ("word_server.search", SEARCH_SQL, ('"house"*', 20), ("words_fts",)),
+    ("normalize_words.find_words", FIND_WORDS_SQL, ("arbol",), ("words",)),
+    (
+        "import_ivan_words.existing_words",
+        EXISTING_WORDS_SQL.format(placeholders="?, ?"),
+        ("abajo", "arbol"),
+        ("words",),
+    ),
+    (
+        "anagram_index.anagrams",
+        ANAGRAMS_SQL,
+        ("amor", "amor"),
+        ("anagram_index",),
+    ),
+    (
+        "translation_search.search_translations",
+        TRANSLATION_SEARCH_SQL,
+        ('"house"*', 20),
+        ("words_fts",),
+    ),
+    (
+        "letter_stats.load_letter_stats",
+        LETTER_STATS_SQL,
+        ("es", 5),
+        ("letter_stats",),
+    ),
+    (
+        "daily words by date",
+        "SELECT word FROM daily_words WHERE date = ?",
+        ("2026-01-01",),
+        ("daily_words",),
+    ),
+]
+
+# Any SCAN step over a table reads every row, with or without an index;
+# SEARCH steps and scans of FTS virtual tables (MATCH lookups) are fine
+FULL_SCAN = re.compile(r"^SCAN (?!\w+ VIRTUAL TABLE)")
+
+# Unfiltered exports of the whole word list; reading every row is their job
+ALLOWED_SCANS = {
+    "extract_words.query_words (all lengths)",
+    "generate_schedule.load_candidates (all words)",
+}
+
+
+def schema_copy(conn):
+    """Return an in-memory database with conn's schema but no rows or stats.
+
+    Plans are checked against the copy so the result depends on the indexes
+    available, not on how the current data happens to be distributed.
+    """
+    copy = sqlite3.connect(":memory:")
+    rows = conn.execute(
+        """
+        SELECT type, name, sql FROM sqlite_master
+        WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+        ORDER BY type = 'table' DESC, rowid
+        """
+    ).fetchall()
+    virtual = [name for _, name, sql in rows if sql.startswith("CREATE VIRTUAL")]
+    for kind, name, sql in rows:
+        # Shadow tables are created by their virtual table
+        if kind == "table" and any(name.startswith(f"{v}_") for v in virtual):
+            continue
+        copy.execute(sql)
+    return copy
+
+
+def explain(conn, sql, params):
+    """Return the detail column of each EXPLAIN QUERY PLAN row."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def full_scans(plan):
+    return [detail for detail in plan if FULL_SCAN.match(detail)]
+
+
+def check_plans(conn, verbose=False):
+    """Explain every registered query; returns the number that do full scans."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    conn = schema_copy(conn)
+    failures = 0
+    for name, sql, params, required in QUERIES:
+        missing = [table for table in required if table not in tables]
+        if missing:
+            print(f"SKIP  {name} (no {', '.join(missing)} table)")
+            continue
+        try:
+            plan = explain(conn, sql, params)
+        except sqlite3.Error as e:
+            # e.g. a column added by a migration that has not been applied
+            failures += 1
+            print(f"FAIL  {name} ({e}; run migrate_schema.py?)")
+            continue
+        scans = full_scans(plan)
+        if scans and name in ALLOWED_SCANS:
+            status = "scan"
+        else:
+            status = "FAIL" if scans else "ok  "
+            failures += bool(scans)
+        print(f"{status}  {name}")
+        for detail in plan if verbose else scans:
+            print(f"      {detail}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fail if any registered query plan does a full table scan."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--verbose", action="store_true", help="Print every query plan step"
+    )
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join("es_data", "es.db")
+    if not os.path.exists(db_path):
+        print(f"Error: Database not found at {db_path}")
+        sys.exit(1)
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        failures = check_plans(conn, args.verbose)
+    finally:
+        conn.close()
+
+    print(f"{failures} of {len(QUERIES)} queries failed the plan check")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,53 @@
+import itertools
+import random
+
+import numpy as np
+
+from feedback_engine import FeedbackEngine, feedback, pattern_dtype
+
+
+def random_words(count, length, letters="abcdeño", seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(letters) for _ in range(length)))
+    return sorted(words)
+
+
+def test_pattern_dtype_holds_every_pattern():
+    for length in range(1, 25):
+        assert 3**length - 1 <= np.iinfo(pattern_dtype(length)).max
+
+
+def test_pattern_matrix_matches_reference_for_long_words():
+    # 3**11 patterns no longer fit in uint16
+    words = random_words(60, 11) + ["abcdeabcdea"]
+    engine = FeedbackEngine(words)
+    matrix = engine.pattern_matrix()
+    assert matrix.dtype == np.uint32
+    for i, j in itertools.product(range(len(words)), repeat=2):
+        assert matrix[i, j] == feedback(words[i], words[j])
+    all_green = engine.index["abcdeabcdea"]
+    assert matrix[all_green, all_green] == 3**11 - 1
+
+
+def test_patterns_for_matches_matrix_for_long_words():
+    words = random_words(40, 12, seed=1)
+    engine = FeedbackEngine(words)
+    expected = [feedback(words[3], answer) for answer in words]
+    assert engine.patterns_for(words[3]).tolist() == expected
+    assert engine.pattern_matrix()[3].tolist() == expected
+
+
+def test_encode_follows_fold_accents():
+    folded = FeedbackEngine(["camión", "salmón"])
+    assert folded.encode("camion") is not None
+    assert folded.encode("CAMIÓN") is not None
+
+    exact = FeedbackEngine(["camión", "salmón"], fold_accents=False)
+    assert exact.encode("camión") is not None
+    assert exact.encode("camion") is None
+    assert exact.patterns_for("salmón").tolist() == [
+        feedback("salmón", "camión"),
+        feedback("salmón", "salmón"),
+    ]
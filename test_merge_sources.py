@@ -0,0 +1,56 @@
+import sqlite3
+
+from createEsWordDB import create_database
+from merge_sources import merge_sources
+
+
+def write_csv(path, rows):
+    lines = ["word,translation,length"]
+    lines += [f"{word},{translation},{len(word)}" for word, translation in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def make_database(tmp_path):
+    db_path = str(tmp_path / "es.db")
+    create_database(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO sources (short_name, description) VALUES (?, ?)",
+        [("ivan", "Ivan"), ("woka", "Woka"), ("self", "Self")],
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def stored(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            word: (translation, source)
+            for word, translation, source in conn.execute(
+                "SELECT word, en_translation, source FROM words"
+            )
+        }
+    finally:
+        conn.close()
+
+
+def test_blank_translation_keeps_stored_translation(tmp_path):
+    db_path = make_database(tmp_path)
+    ivan = write_csv(tmp_path / "ivan.csv", [("mesa", "table"), ("perro", "dog")])
+    merge_sources([("ivan", ivan)], db_path)
+
+    own = write_csv(tmp_path / "self.csv", [("mesa", ""), ("perro", "hound")])
+    result = merge_sources([("self", own)], db_path, priority=["self", "woka", "ivan"])
+
+    words = stored(db_path)
+    assert words["mesa"] == ("table", "self")
+    assert words["perro"] == ("hound", "self")
+    assert result["updated"] == 2
+
+    # Merging the same file again changes nothing
+    result = merge_sources([("self", own)], db_path)
+    assert result["updated"] == 0
+    assert stored(db_path) == words
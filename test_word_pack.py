@@ -0,0 +1,74 @@
+import sqlite3
+
+from createEsWordDB import create_database
+from export_word_pack import build_groups, export_word_pack, write_pack
+from word_pack import WordPack
+
+# Several lengths, multibyte letters (so byte widths differ from character
+# lengths) and missing translations
+ROWS = [
+    ("sol", "sun"),
+    ("mar", None),
+    ("año", "year"),
+    ("niño", "child"),
+    ("mesa", ""),
+    ("árbol", "tree"),
+    ("perro", "dog"),
+    ("canción", "song"),
+    ("pingüino", "penguin"),
+    ("corazón", None),
+    ("murciélago", "bat"),
+]
+
+
+def expected_by_length(rows):
+    """Return {length: [(word, translation or None), ...]} in pack order."""
+    groups = {}
+    for word, translation in rows:
+        groups.setdefault(len(word), []).append((word, translation or None))
+    for entries in groups.values():
+        entries.sort(key=lambda entry: entry[0].encode("utf-8"))
+    return groups
+
+
+def check_pack(path, rows, language_code="es"):
+    expected = expected_by_length(rows)
+    with WordPack(path) as pack:
+        assert pack.language_code == language_code
+        assert len(pack) == len(rows)
+        assert sorted(pack.groups) == sorted(expected)
+        for length, entries in expected.items():
+            assert list(pack.words(length)) == entries
+        for word, translation in rows:
+            assert word in pack
+            assert pack.translation(word) == (translation or None)
+        assert "gato" not in pack
+        assert "arbol" not in pack
+        assert pack.translation("gato") is None
+
+
+def test_pack_round_trip(tmp_path):
+    path = str(tmp_path / "words.wpk")
+    write_pack(path, "es", build_groups(ROWS))
+    check_pack(path, ROWS)
+
+
+def test_export_from_database(tmp_path):
+    db_path = str(tmp_path / "es.db")
+    create_database(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO sources (short_name, description) VALUES ('self', '')")
+    conn.executemany(
+        """
+        INSERT INTO words (word, en_translation, length, frequency, level, source)
+        VALUES (?, ?, ?, 0, 0, 'self')
+        """,
+        [(word, translation, len(word)) for word, translation in ROWS],
+    )
+    conn.commit()
+    conn.close()
+
+    path = str(tmp_path / "words_es.wpk")
+    count = export_word_pack("es", db_path=db_path, output_path=path, verify=True)
+    assert count == len(ROWS)
+    check_pack(path, ROWS)
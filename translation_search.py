@@ -0,0 +1,193 @@
+"""Full-text and prefix search over English translations.
+
+words_fts is an FTS5 index over words.en_translation that stores no copy of
+the text (content=words); triggers on words keep it in sync on insert,
+delete and translation changes, and bulk loads drop them and rebuild the
+index once instead (see bulk_translation_load). Reverse lookups ("which words translate to
+house") are answered from the index instead of a LIKE scan, with prefix
+indexes for two- and three-letter prefixes so type-ahead queries stay fast.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+SEARCH_SQL = """
+    SELECT w.word, w.en_translation, w.frequency
+    FROM words_fts
+    JOIN words w ON w.word_id = words_fts.rowid
+    WHERE words_fts MATCH ?
+    ORDER BY COALESCE(w.frequency, 0) DESC, words_fts.rank
+    LIMIT ?
+    """
+
+
+# Keep words_fts in sync with words.en_translation; an update that does not
+# change the translation leaves the index alone
+TRIGGERS = {
+    "words_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS words_fts_insert AFTER INSERT ON words BEGIN
+            INSERT INTO words_fts (rowid, en_translation)
+            VALUES (new.word_id, new.en_translation);
+        END
+        """,
+    "words_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS words_fts_delete AFTER DELETE ON words BEGIN
+            INSERT INTO words_fts (words_fts, rowid, en_translation)
+            VALUES ('delete', old.word_id, old.en_translation);
+        END
+        """,
+    "words_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS words_fts_update
+        AFTER UPDATE OF en_translation ON words
+        WHEN old.en_translation IS NOT new.en_translation
+        BEGIN
+            INSERT INTO words_fts (words_fts, rowid, en_translation)
+            VALUES ('delete', old.word_id, old.en_translation);
+            INSERT INTO words_fts (rowid, en_translation)
+            VALUES (new.word_id, new.en_translation);
+        END
+        """,
+}
+
+
+def has_translation_index(conn):
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'words_fts'"
+        ).fetchone()
+        is not None
+    )
+
+
+def missing_triggers(conn):
+    existing = {
+        name
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+    }
+    return [name for name in TRIGGERS if name not in existing]
+
+
+def create_translation_triggers(conn):
+    for sql in TRIGGERS.values():
+        conn.execute(sql)
+
+
+def drop_translation_triggers(conn):
+    for name in TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def ensure_translation_index(conn):
+    """Create words_fts and its sync triggers if missing.
+
+    Triggers left dropped by an interrupted bulk load are recreated too.
+    Returns True if the index was created or repaired (and filled from words).
+    """
+    if has_translation_index(conn):
+        if not missing_triggers(conn):
+            return False
+    else:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE words_fts USING fts5(
+                en_translation,
+                content = 'words',
+                content_rowid = 'word_id',
+                prefix = '2 3'
+            )
+            """
+        )
+    create_translation_triggers(conn)
+    rebuild_translation_index(conn)
+    return True
+
+
+def rebuild_translation_index(conn):
+    """Re-read every translation from words into words_fts."""
+    conn.execute("INSERT INTO words_fts (words_fts) VALUES ('rebuild')")
+
+
+@contextmanager
+def bulk_translation_load(conn):
+    """Drop the sync triggers for a bulk load, then rebuild words_fts once.
+
+    One 'rebuild' pass is much cheaper than updating the index row by row.
+    If the process dies in between, ensure_translation_index (or the
+    --rebuild option) restores the triggers.
+    """
+    if not has_translation_index(conn):
+        yield
+        return
+    drop_translation_triggers(conn)
+    try:
+        yield
+    finally:
+        create_translation_triggers(conn)
+        rebuild_translation_index(conn)
+
+
+def match_expression(text, prefix=True):
+    """Turn free text into an FTS5 query matching all of its words.
+
+    With prefix, the last word also matches as a prefix ("hous" -> house).
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    if prefix:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_translations(conn, text, limit=20, prefix=True):
+    """Return (word, en_translation, frequency) rows whose translation matches text.
+
+    The most frequent words come first; ties are broken by FTS relevance.
+    """
+    expression = match_expression(text, prefix)
+    if expression is None:
+        return []
+    cursor = conn.execute(SEARCH_SQL, (expression, limit))
+    return cursor.fetchall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the words_fts index and search English translations."
+    )
+    parser.add_argument("query", nargs="?", help="English text to look up")
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild words_fts from words"
+    )
+    parser.add_argument(
+        "--exact", action="store_true", help="Do not match the last word as a prefix"
+    )
+    parser.add_argument("--limit", type=int, default=20, help="Maximum results")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db or os.path.join("es_data", "es.db"))
+    try:
+        if ensure_translation_index(conn):
+            print("Built words_fts")
+        elif args.rebuild:
+            create_translation_triggers(conn)
+            rebuild_translation_index(conn)
+            print("Rebuilt words_fts")
+        conn.commit()
+        if args.query:
+            rows = search_translations(conn, args.query, args.limit, not args.exact)
+            for word, translation, frequency in rows:
+                print(f"{word}  {translation}  ({frequency or 0:.4f})")
+            if not rows:
+                print("No matches found")
+    finally:
+        conn.close()
@@ -1,43 +1,204 @@
+import argparse
 import csv
+import getpass
 import sqlite3
 import os
+from datetime import date
 
+import pipeline_stats
+from build_state import (
+    changed_keys,
+    file_hash,
+    is_unchanged,
+    record_file,
+    record_rows,
+    row_hash,
+    words_generation,
+)
 
-def update_word_levels():
-    # Database and CSV file paths
-    db_path = os.path.join("es_data", "es.db")
-    csv_path = os.path.join("es_data", "es_5_levels.csv")
-
-    # Connect to the database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    # Read CSV and update levels
+def read_levels(csv_path):
+    """Return (word, level) pairs from the levels CSV and the number of invalid rows."""
+    levels = []
+    invalid = 0
     with open(csv_path, "r", encoding="utf-8") as csvfile:
         csvreader = csv.reader(csvfile)
         # Skip the header row
         next(csvreader)
         for row in csvreader:
-            if len(row) == 2:
-                word, level = row
-                try:
-                    # Update the level for the word
-                    cursor.execute(
-                        """
-                        UPDATE words
-                        SET level = ?
-                        WHERE word = ?
-                    """,
-                        (int(level), word),
-                    )
-                except sqlite3.Error as e:
-                    print(f"Error updating word '{word}': {e}")
-
-    # Commit changes and close connection
-    conn.commit()
-    conn.close()
-    print("Word levels updated successfully!")
+            if not row:
+                # Blank line
+                continue
+            if len(row) != 2 or not row[0].strip():
+                # Truncated or mis-delimited rows must not pass as a clean run
+                invalid += 1
+                continue
+            word, level = row
+            try:
+                level = int(level)
+            except ValueError:
+                invalid += 1
+                continue
+            if level < 0 or level > 10:
+                invalid += 1
+                continue
+            levels.append((word.strip(), level))
+    return levels, invalid
+
+
+def edit_date():
+    """Format today's date the way the edits table records it, e.g. 11-mar-2025."""
+    today = date.today()
+    return f"{today.day}-{today.strftime('%b').lower()}-{today.year}"
+
+
+def update_word_levels(db_path=None, csv_path=None, author=None, incremental=False):
+    # Database and CSV file paths
+    db_path = db_path or os.path.join("es_data", "es.db")
+    csv_path = csv_path or os.path.join("es_data", "es_5_levels.csv")
+    author = author or getpass.getuser()
+    stats = pipeline_stats.get()
+
+    # Connect to the database
+    conn = stats.track(sqlite3.connect(db_path))
+    cursor = conn.cursor()
+
+    if incremental:
+        # Rows for words that do not exist yet apply once they are imported,
+        # so an unchanged CSV is only skipped if the words are unchanged too
+        content_hash = file_hash(csv_path)
+        generation = words_generation(conn)
+        if is_unchanged(conn, "levels", csv_path, content_hash, generation):
+            conn.close()
+            print(f"Skipping level update: {csv_path} is unchanged since the last run")
+            return {"updated": 0, "unchanged": 0, "unknown": 0, "invalid": 0}
+
+    with stats.stage("parse") as stage:
+        levels, invalid = read_levels(csv_path)
+        stage.rows += len(levels)
+        stage.errors += invalid
+    row_count = len(levels)
+    if incremental:
+        with stats.stage("diff") as stage:
+            hashed = [(word, row_hash((level,))) for word, level in levels]
+            changed_words = changed_keys(conn, "levels", csv_path, hashed)
+            levels = [(word, level) for word, level in levels if word in changed_words]
+            stage.rows += len(hashed)
+
+    try:
+        # Load the whole CSV into a temp table with one bulk insert; later rows
+        # for the same word win, as they did with one UPDATE per row
+        with stats.stage("load") as stage:
+            cursor.execute(
+                """
+                CREATE TEMP TABLE new_levels (
+                    word TEXT PRIMARY KEY,
+                    level INTEGER NOT NULL
+                )
+                """
+            )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO new_levels (word, level) VALUES (?, ?)", levels
+            )
+            stage.rows += len(levels)
+
+        with stats.stage("compare"):
+            cursor.execute(
+                """
+                SELECT
+                    SUM(w.word IS NULL),
+                    SUM(w.word IS NOT NULL AND w.level = n.level)
+                FROM new_levels n
+                LEFT JOIN words w ON w.word = n.word
+                """
+            )
+            unknown, unchanged = (count or 0 for count in cursor.fetchone())
+
+        # Record the changes before applying them so the old level is known
+        with stats.stage("record_edits") as stage:
+            cursor.execute(
+                """
+                INSERT INTO edits (date, word, change_description, author)
+                SELECT ?, w.word, 'level changed from ' || w.level || ' to ' || n.level, ?
+                FROM new_levels n
+                JOIN words w ON w.word = n.word
+                WHERE w.level <> n.level
+                """,
+                (edit_date(), author),
+            )
+            stage.rows += cursor.rowcount
+
+        with stats.stage("update") as stage:
+            cursor.execute(
+                """
+                UPDATE words
+                SET level = new_levels.level
+                FROM new_levels
+                WHERE words.word = new_levels.word AND words.level <> new_levels.level
+                """
+            )
+            updated = cursor.rowcount
+            stage.rows += updated
+
+        if incremental:
+            # Only rows that matched a word were applied; unknown ones are retried
+            applied = {
+                word
+                for (word,) in cursor.execute(
+                    "SELECT n.word FROM new_levels n JOIN words w ON w.word = n.word"
+                )
+            }
+            record_rows(
+                conn,
+                "levels",
+                csv_path,
+                [(word, digest) for word, digest in hashed if word in applied],
+            )
+            record_file(conn, "levels", csv_path, content_hash, row_count, generation)
+
+        # Commit changes
+        with stats.stage("commit"):
+            conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"Error updating word levels: {e}")
+        raise
+    finally:
+        conn.close()
+
+    print(
+        f"Word levels updated successfully! Updated: {updated}, "
+        f"Unchanged: {unchanged}, Unknown: {unknown}, Invalid: {invalid}"
+    )
+    return {
+        "updated": updated,
+        "unchanged": unchanged,
+        "unknown": unknown,
+        "invalid": invalid,
+    }
 
 
 if __name__ == "__main__":
-    update_word_levels()
+    parser = argparse.ArgumentParser(
+        description="Apply word levels from a CSV file to the words table."
+    )
+    parser.add_argument("--db", help="Path to the language database")
+    parser.add_argument("--csv", help="CSV file with word and level columns")
+    parser.add_argument("--author", help="Author recorded in the edits table")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip an unchanged CSV and only apply new or changed rows",
+    )
+    pipeline_stats.add_arguments(parser)
+    args = parser.parse_args()
+
+    pipeline_stats.run_with_args(
+        args,
+        "update_word_levels",
+        update_word_levels,
+        args.db,
+        args.csv,
+        args.author,
+        args.incremental,
+    )
@@ -0,0 +1,403 @@
+"""Check a word CSV or a language database against every words-table rule at once.
+
+SQLite's CHECK constraints stop an import at the first bad row; this scans a
+whole input in one pass and reports every violation: missing or too long
+words, a length that does not match the word, level and frequency ranges,
+source names that are not 4 characters or not in the sources table, overlong
+translations, and words that repeat or share a normalized form. Rules are
+compiled once per process; large inputs are split into chunks checked by
+worker processes, and only the duplicate checks, which need every row, run
+in the main process.
+
+The report is JSON: row and violation counts per input plus one entry per
+violation with its line (CSV) or word_id (database). The exit status is 1 if
+any input has errors, so a bad CSV can be rejected before it touches es.db:
+
+    python validate_words.py new_words.csv --report report.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from import_ivan_words import (
+    MAX_TRANSLATION_LENGTH,
+    MAX_WORD_LENGTH,
+    chunked,
+    read_rows,
+)
+from normalize_words import fold_enye_rule, normalize_word
+
+DEFAULT_CHUNK_SIZE = 20000
+# Below this many rows starting worker processes costs more than it saves
+PARALLEL_THRESHOLD = 50000
+
+MIN_LEVEL = 0
+MAX_LEVEL = 10
+SOURCE_NAME_LENGTH = 4
+
+ERROR = "error"
+WARNING = "warning"
+
+# Position of each field in the row tuples handed to the rules
+LINE, WORD, TRANSLATION, LENGTH, LEVEL, FREQUENCY, SOURCE = range(7)
+
+
+def _integer(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _blank(value):
+    return value is None or str(value).strip() == ""
+
+
+def check_word(row):
+    if _blank(row[WORD]):
+        return "missing word"
+    if len(row[WORD]) > MAX_WORD_LENGTH:
+        return f"word exceeds {MAX_WORD_LENGTH} characters"
+
+
+def check_length(row):
+    length = _integer(row[LENGTH])
+    if length is None:
+        return f"invalid length '{row[LENGTH]}'"
+    if length < 1 or length > MAX_WORD_LENGTH:
+        return f"length {length} out of range"
+
+
+def check_length_matches(row):
+    length = _integer(row[LENGTH])
+    if length is None or _blank(row[WORD]):
+        return None
+    # Composed, so "ñ" counts as one letter however the file encodes it
+    actual = len(unicodedata.normalize("NFC", row[WORD]))
+    if length != actual:
+        return f"length {length} does not match the word's {actual} letters"
+
+
+def check_translation(row):
+    if row[TRANSLATION] and len(row[TRANSLATION]) > MAX_TRANSLATION_LENGTH:
+        return f"translation exceeds {MAX_TRANSLATION_LENGTH} characters"
+
+
+def check_level(row):
+    if _blank(row[LEVEL]):
+        return None
+    level = _integer(row[LEVEL])
+    if level is None or level < MIN_LEVEL or level > MAX_LEVEL:
+        return f"level '{row[LEVEL]}' is not between {MIN_LEVEL} and {MAX_LEVEL}"
+
+
+def check_frequency(row):
+    if _blank(row[FREQUENCY]):
+        return None
+    frequency = _number(row[FREQUENCY])
+    if frequency is None or frequency < 0 or frequency > 1:
+        return f"frequency '{row[FREQUENCY]}' is not between 0 and 1"
+
+
+def check_source_name(row):
+    if _blank(row[SOURCE]):
+        return "missing source"
+    if len(row[SOURCE]) != SOURCE_NAME_LENGTH:
+        return f"source '{row[SOURCE]}' is not {SOURCE_NAME_LENGTH} characters"
+
+
+def compile_rules(known_sources=None):
+    """Return the [(rule, severity, check), ...] applied to every row.
+
+    With known_sources (short names from the sources table), rows from any
+    other source are errors too.
+    """
+    rules = [
+        ("word", ERROR, check_word),
+        ("length", ERROR, check_length),
+        ("length_mismatch", ERROR, check_length_matches),
+        ("translation_length", ERROR, check_translation),
+        ("level_range", ERROR, check_level),
+        ("frequency_range", ERROR, check_frequency),
+        ("source_name", ERROR, check_source_name),
+    ]
+    if known_sources is not None:
+        known = frozenset(known_sources)
+
+        def check_known_source(row):
+            if not _blank(row[SOURCE]) and row[SOURCE] not in known:
+                return f"unknown source '{row[SOURCE]}'"
+
+        rules.append(("unknown_source", ERROR, check_known_source))
+    return rules
+
+
+def violation(row, rule, severity, message):
+    return {
+        "line": row[LINE],
+        "word": row[WORD],
+        "rule": rule,
+        "severity": severity,
+        "message": message,
+    }
+
+
+# Rules of the current process, compiled once by _init_worker
+_rules = None
+_fold_enye = False
+
+
+def _init_worker(known_sources, fold_enye):
+    global _rules, _fold_enye
+    _rules = compile_rules(known_sources)
+    _fold_enye = fold_enye
+
+
+def check_rows(rows):
+    """Apply the compiled rules to a chunk of row tuples.
+
+    Returns (violations, keys), where keys holds (line, word, normalized
+    form) of each row with a word, for the duplicate checks.
+    """
+    violations = []
+    keys = []
+    for row in rows:
+        for rule, severity, check in _rules:
+            message = check(row)
+            if message is not None:
+                violations.append(violation(row, rule, severity, message))
+        if not _blank(row[WORD]):
+            keys.append((row[LINE], row[WORD], normalize_word(row[WORD], _fold_enye)))
+    return violations, keys
+
+
+def check_duplicates(keys):
+    """Report repeated words (errors) and words sharing a normalized form (warnings)."""
+    violations = []
+    first_word = {}
+    first_form = {}
+    for line, word, normalized in keys:
+        row = (line, word)
+        if word in first_word:
+            message = f"duplicate of line {first_word[word]}"
+            violations.append(violation(row, "duplicate_word", ERROR, message))
+            continue
+        first_word[word] = line
+        if normalized in first_form:
+            other_line, other = first_form[normalized]
+            message = (
+                f"same normalized form '{normalized}' as '{other}' (line {other_line})"
+            )
+            violations.append(violation(row, "duplicate_normalized", WARNING, message))
+        else:
+            first_form[normalized] = (line, word)
+    return violations
+
+
+def csv_rows(csv_path, default_source=None):
+    """Yield row tuples from a CSV with word, translation and length columns.
+
+    level, frequency and source columns are optional; rows without a source
+    get default_source.
+    """
+    for line_number, row in read_rows(csv_path):
+        word = (row.get("word") or "").strip()
+        yield (
+            line_number,
+            word,
+            (row.get("translation") or "").strip(),
+            row.get("length"),
+            row.get("level"),
+            row.get("frequency"),
+            (row.get("source") or "").strip() or default_source,
+        )
+
+
+def database_rows(conn):
+    """Yield row tuples from the words table, numbered by word_id."""
+    cursor = conn.execute(
+        """
+        SELECT word_id, word, en_translation, length, level, frequency, source
+        FROM words ORDER BY word_id
+        """
+    )
+    yield from cursor
+
+
+def known_sources(conn):
+    return {name for (name,) in conn.execute("SELECT short_name FROM sources")}
+
+
+def validate_rows(
+    rows,
+    known=None,
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    fold_enye=False,
+):
+    """Check row tuples; returns (number of rows, violations sorted by line)."""
+    chunks = list(chunked(rows, chunk_size))
+    total = sum(len(chunk) for chunk in chunks)
+
+    if workers != 1 and total >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(known, fold_enye),
+        ) as executor:
+            results = list(executor.map(check_rows, chunks))
+    else:
+        _init_worker(known, fold_enye)
+        results = [check_rows(chunk) for chunk in chunks]
+
+    violations = [v for chunk_violations, _ in results for v in chunk_violations]
+    violations += check_duplicates([key for _, keys in results for key in keys])
+    violations.sort(key=lambda v: v["line"])
+    return total, violations
+
+
+def build_report(input_path, total, violations, elapsed):
+    rules = {}
+    for v in violations:
+        rules[v["rule"]] = rules.get(v["rule"], 0) + 1
+    return {
+        "input": input_path,
+        "rows": total,
+        "errors": sum(v["severity"] == ERROR for v in violations),
+        "warnings": sum(v["severity"] == WARNING for v in violations),
+        "rules": rules,
+        "seconds": round(elapsed, 3),
+        "violations": violations,
+    }
+
+
+def validate_input(
+    input_path,
+    db_path=None,
+    default_source="ivan",
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """Validate a CSV file or a .db language database and return its report.
+
+    Sources are checked against the sources table, and normalized forms
+    compared with the fold_enye rule, of the database itself or, for a CSV,
+    of db_path when that database exists.
+    """
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input not found: {input_path}")
+    start = time.perf_counter()
+
+    if input_path.endswith(".db"):
+        uri = f"file:{os.path.abspath(input_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            known = known_sources(conn)
+            fold_enye = fold_enye_rule(conn)
+            rows = list(database_rows(conn))
+        finally:
+            conn.close()
+    else:
+        known = None
+        fold_enye = False
+        if db_path and os.path.exists(db_path):
+            conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+            try:
+                known = known_sources(conn)
+                fold_enye = fold_enye_rule(conn)
+            finally:
+                conn.close()
+        rows = csv_rows(input_path, default_source)
+
+    total, violations = validate_rows(rows, known, workers, chunk_size, fold_enye)
+    return build_report(input_path, total, violations, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report every rule violation in word CSVs or language databases."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=[os.path.join("es_data", "es.db")],
+        help="CSV files or .db databases to check (default: es_data/es.db)",
+    )
+    parser.add_argument(
+        "--db",
+        default=os.path.join("es_data", "es.db"),
+        help="Database whose sources table CSV sources are checked against",
+    )
+    parser.add_argument(
+        "--source",
+        default="ivan",
+        help="Source of CSV rows without a source column (default: ivan)",
+    )
+    parser.add_argument("--report", help="Write the full JSON report to this file")
+    parser.add_argument(
+        "--workers", type=int, help="Number of worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows per worker task",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Violations printed per input (the report has all of them)",
+    )
+    args = parser.parse_args()
+
+    reports = []
+    failed = False
+    for input_path in args.inputs:
+        try:
+            report = validate_input(
+                input_path,
+                args.db,
+                args.source,
+                args.workers,
+                args.chunk_size,
+            )
+        except (OSError, sqlite3.Error) as e:
+            failed = True
+            print(f"Error validating {input_path}: {e}")
+            continue
+        reports.append(report)
+        failed = failed or report["errors"] > 0
+
+        print(
+            f"{input_path}: {report['rows']} rows, {report['errors']} errors, "
+            f"{report['warnings']} warnings in {report['seconds']:.2f}s"
+        )
+        for v in report["violations"][: args.limit]:
+            print(
+                f"  {v['line']}: {v['word']!r} {v['severity']} {v['rule']}: {v['message']}"
+            )
+        hidden = len(report["violations"]) - args.limit
+        if hidden > 0:
+            print(f"  ... and {hidden} more")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=4)
+        print(f"Report written to {args.report}")
+
+    if failed:
+        sys.exit(1)
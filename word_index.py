@@ -0,0 +1,196 @@
+"""In-memory index over the words table for guess validation and pattern queries.
+
+The words table is small and read-mostly, so it is loaded once into:
+
+- a set of all words for O(1) validity checks
+- per-length sorted word lists
+- per-length bitmaps (Python ints, bit i = i-th word of that length) for
+  "letter x at position p" and "contains letter x"
+
+Pattern and letter queries are then a handful of bitwise ANDs instead of a
+SQLite query. The index reloads itself when the database changes: it keeps a
+read-only connection open and compares PRAGMA data_version, which changes
+on every commit by another connection (WAL writes included), and the file's
+inode, which changes when the file is replaced.
+"""
+
+import os
+import sqlite3
+import time
+
+WILDCARD = "_"
+
+
+def _bit_indexes(bits):
+    """Yield the positions of the set bits in bits, lowest first.
+
+    The int is converted to bytes once, so the walk is linear in its size;
+    clearing bits one by one on the int itself copies it on every step.
+    """
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield offset * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+def _bitmap(indexes, size):
+    """Return an int with the given bit positions set."""
+    data = bytearray((size + 7) // 8)
+    for i in indexes:
+        data[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(data, "little")
+
+
+class _LengthGroup:
+    def __init__(self, words):
+        self.words = sorted(words)
+        size = len(self.words)
+        self.all = (1 << size) - 1
+        # Collect indexes first; OR-ing bits into growing ints is quadratic
+        positions = {}
+        contains = {}
+        for i, word in enumerate(self.words):
+            for position, letter in enumerate(word):
+                positions.setdefault((position, letter), []).append(i)
+            for letter in set(word):
+                contains.setdefault(letter, []).append(i)
+        self.positions = {key: _bitmap(ix, size) for key, ix in positions.items()}
+        self.contains = {key: _bitmap(ix, size) for key, ix in contains.items()}
+
+    def select(self, bits):
+        return [self.words[i] for i in _bit_indexes(bits)]
+
+
+class WordIndex:
+    def __init__(self, db_path=None, check_interval=1.0):
+        self.db_path = db_path or os.path.join("es_data", "es.db")
+        self.check_interval = check_interval
+        self.valid_lookups = 0
+        self.invalid_lookups = 0
+        self.queries = 0
+        self.reloads = 0
+        self._conn = None
+        self._inode = None
+        self._signature = None
+        self._last_check = 0.0
+        self.load()
+
+    def _connect(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._inode = os.stat(self.db_path).st_ino
+        self._conn = sqlite3.connect(
+            f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True
+        )
+
+    def _db_signature(self):
+        """Return a value that changes whenever the words may have changed."""
+        if os.stat(self.db_path).st_ino != self._inode:
+            # The file was replaced (e.g. by build_languages.py)
+            self._connect()
+        (data_version,) = self._conn.execute("PRAGMA data_version").fetchone()
+        return self._inode, data_version
+
+    def load(self):
+        """(Re)load every word from the database into memory."""
+        if self._conn is None:
+            self._connect()
+        signature = self._db_signature()
+        words = [word for (word,) in self._conn.execute("SELECT word FROM words")]
+
+        by_length = {}
+        for word in words:
+            by_length.setdefault(len(word), []).append(word)
+
+        self.words = set(words)
+        self.groups = {
+            length: _LengthGroup(group) for length, group in by_length.items()
+        }
+        self._signature = signature
+        self._last_check = time.monotonic()
+        self.reloads += 1
+
+    def refresh(self, force=False):
+        """Reload if the database changed since it was last loaded.
+
+        Unless forced, the file is checked at most once per check_interval.
+        Returns True if the index was reloaded.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        if self._db_signature() == self._signature:
+            return False
+        self.load()
+        return True
+
+    def is_valid(self, word):
+        """Return True if word is in the words table."""
+        self.refresh()
+        if word in self.words:
+            self.valid_lookups += 1
+            return True
+        self.invalid_lookups += 1
+        return False
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __contains__(self, word):
+        return self.is_valid(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def match(self, pattern, contains="", excludes=""):
+        """Return words matching pattern, e.g. "c_s_a", sorted.
+
+        "_" matches any letter. contains and excludes are strings of letters
+        that must, or must not, appear anywhere in the word.
+        """
+        self.refresh()
+        self.queries += 1
+        group = self.groups.get(len(pattern))
+        if group is None:
+            return []
+
+        bits = group.all
+        for position, letter in enumerate(pattern):
+            if letter != WILDCARD:
+                bits &= group.positions.get((position, letter), 0)
+                if not bits:
+                    return []
+        return group.select(self._filter_letters(group, bits, contains, excludes))
+
+    def with_letters(self, length, contains="", excludes=""):
+        """Return words of the given length containing/excluding letters."""
+        self.refresh()
+        self.queries += 1
+        group = self.groups.get(length)
+        if group is None:
+            return []
+        return group.select(self._filter_letters(group, group.all, contains, excludes))
+
+    @staticmethod
+    def _filter_letters(group, bits, contains, excludes):
+        for letter in set(contains):
+            bits &= group.contains.get(letter, 0)
+        for letter in set(excludes):
+            bits &= ~group.contains.get(letter, 0)
+        return bits
+
+    def stats(self):
+        lookups = self.valid_lookups + self.invalid_lookups
+        return {
+            "words": len(self.words),
+            "valid_lookups": self.valid_lookups,
+            "invalid_lookups": self.invalid_lookups,
+            "valid_rate": self.valid_lookups / lookups if lookups else 0.0,
+            "queries": self.queries,
+            "reloads": self.reloads,
+        }
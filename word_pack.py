@@ -0,0 +1,153 @@
+"""Reader for the binary word-pack format written by export_word_pack.py.
+
+Layout (all integers little-endian):
+
+    header       magic "WPK1", version u16, group count u16,
+                 language code (8 bytes, NUL padded), string pool offset u32,
+                 string pool size u32
+    group table  one entry per word length: length u16, slot width u16,
+                 word count u32, words offset u32, translations offset u32
+    words        per group, count fixed-width slots of UTF-8 bytes padded
+                 with NUL, sorted bytewise so they can be binary searched
+    translations per group, count (offset u32, size u32) pairs into the
+                 string pool, in the same order as the words
+    string pool  UTF-8 translation text
+
+The file is opened with mmap, so looking up a word only touches the pages
+that the binary search visits.
+"""
+
+import mmap
+import struct
+from bisect import bisect_left
+
+MAGIC = b"WPK1"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8sII")
+GROUP = struct.Struct("<HHIII")
+TRANSLATION = struct.Struct("<II")
+
+
+class WordPackError(Exception):
+    pass
+
+
+class _Slots:
+    """Sequence view over one group's fixed-width word slots for bisect."""
+
+    def __init__(self, buffer, offset, width, count):
+        self.buffer = buffer
+        self.offset = offset
+        self.width = width
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start = self.offset + index * self.width
+        return bytes(self.buffer[start : start + self.width])
+
+
+class WordGroup:
+    def __init__(self, pack, length, width, count, words_offset, translations_offset):
+        self.pack = pack
+        self.length = length
+        self.width = width
+        self.count = count
+        self.translations_offset = translations_offset
+        self.slots = _Slots(pack.buffer, words_offset, width, count)
+
+    def __len__(self):
+        return self.count
+
+    def find(self, word):
+        """Return the index of word in this group, or -1 if it is not present."""
+        key = word.encode("utf-8")
+        if len(key) > self.width:
+            return -1
+        key = key.ljust(self.width, b"\0")
+        index = bisect_left(self.slots, key)
+        if index < self.count and self.slots[index] == key:
+            return index
+        return -1
+
+    def word(self, index):
+        return self.slots[index].rstrip(b"\0").decode("utf-8")
+
+    def translation(self, index):
+        offset, size = TRANSLATION.unpack_from(
+            self.pack.buffer, self.translations_offset + index * TRANSLATION.size
+        )
+        if size == 0:
+            return None
+        start = self.pack.pool_offset + offset
+        return bytes(self.pack.buffer[start : start + size]).decode("utf-8")
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.word(index), self.translation(index)
+
+
+class WordPack:
+    """Memory-mapped word pack with O(log n) membership checks per length."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise WordPackError(f"Empty word pack '{path}'")
+
+        if len(self.buffer) < HEADER.size:
+            self.close()
+            raise WordPackError(f"Truncated word pack '{path}'")
+        magic, version, group_count, language, pool_offset, pool_size = (
+            HEADER.unpack_from(self.buffer, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise WordPackError(f"'{path}' is not a version {VERSION} word pack")
+
+        self.language_code = language.rstrip(b"\0").decode("ascii")
+        self.pool_offset = pool_offset
+        self.pool_size = pool_size
+        self.groups = {}
+        for i in range(group_count):
+            entry = GROUP.unpack_from(self.buffer, HEADER.size + i * GROUP.size)
+            group = WordGroup(self, *entry)
+            self.groups[group.length] = group
+
+    def close(self):
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, word):
+        group = self.groups.get(len(word))
+        return group is not None and group.find(word) >= 0
+
+    def __len__(self):
+        return sum(group.count for group in self.groups.values())
+
+    def translation(self, word):
+        """Return the translation of word, or None if missing or unknown."""
+        group = self.groups.get(len(word))
+        if group is None:
+            return None
+        index = group.find(word)
+        return group.translation(index) if index >= 0 else None
+
+    def words(self, length=None):
+        """Yield (word, translation) pairs, optionally for one length only."""
+        lengths = [length] if length is not None else sorted(self.groups)
+        for group_length in lengths:
+            group = self.groups.get(group_length)
+            if group is not None:
+                yield from group
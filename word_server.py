@@ -0,0 +1,462 @@
+"""Read-only HTTP lookup API over a language database.
+
+Endpoints (all GET, JSON responses):
+
+    /health                               service status and cache stats
+    /words/<word>                         validity, translation, level, length
+    /words?length=5&level=3&limit=100     words by length and/or level, in
+                                          pages that continue after=<word>
+    /random?length=5&level=3              one random word
+    /search?q=house&limit=20              words whose translation matches
+
+SQLite queries run on a small pool of read-only connections (opened with
+immutable=1 and memory-mapped I/O) in worker threads, so the asyncio event
+loop never blocks on the database. Responses are kept in an LRU cache with
+a TTL; /random is never cached but the word_id range it draws from is.
+
+Uses only the standard library, so it can be run and tested locally:
+
+    python word_server.py --db es_data/es.db --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from translation_search import match_expression
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TTL = 300.0
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+MAX_LIMIT = 1000
+
+LOOKUP_SQL = "SELECT word, en_translation, level, length FROM words WHERE word = ?"
+
+SEARCH_SQL = """
+    SELECT w.word, w.en_translation
+    FROM words_fts
+    JOIN words w ON w.word_id = words_fts.rowid
+    WHERE words_fts MATCH ?
+    ORDER BY COALESCE(w.frequency, 0) DESC, words_fts.rank
+    LIMIT ?
+    """
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class LRUCache:
+    """Least-recently-used cache whose entries expire after ttl seconds.
+
+    Safe to use from the event loop and the worker threads at the same time.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ConnectionPool:
+    """Fixed pool of read-only SQLite connections shared by worker threads."""
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, mmap_size=DEFAULT_MMAP_SIZE):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Database not found: {db_path}")
+        uri = f"file:{os.path.abspath(db_path)}?mode=ro&immutable=1"
+        self.connections = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+            self.connections.put(conn)
+        self.size = size
+
+    def query(self, sql, params=()):
+        conn = self.connections.get()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            self.connections.put(conn)
+
+    def close(self):
+        for _ in range(self.size):
+            self.connections.get().close()
+
+
+def word_filters(length=None, level=None):
+    """Return the conditions and parameters for optional length/level filters."""
+    conditions = []
+    params = []
+    if length is not None:
+        conditions.append("length = ?")
+        params.append(length)
+    if level is not None:
+        conditions.append("level = ?")
+        params.append(level)
+    return conditions, params
+
+
+def where_clause(conditions):
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def words_query(length=None, level=None, limit=100, after=""):
+    """Return one page of words in word order, starting after the word after.
+
+    Pages are read by seeking to after in an index on word, so a late page
+    costs no more than the first one.
+    """
+    conditions, params = word_filters(length, level)
+    sql = f"""
+        SELECT word, en_translation FROM words
+        {where_clause(conditions + ["word > ?"])}
+        ORDER BY word LIMIT ?
+        """
+    return sql, params + [after, limit]
+
+
+def id_range_query(length=None, level=None):
+    """Return the lowest and highest word_id of the matching words, as two rows.
+
+    Two selects, because SQLite only reads MIN or MAX of the rowid straight
+    from the b-tree when the query has a single one of them.
+    """
+    conditions, params = word_filters(length, level)
+    where = where_clause(conditions)
+    sql = f"""
+        SELECT MIN(word_id) FROM words {where}
+        UNION ALL
+        SELECT MAX(word_id) FROM words {where}
+        """
+    return sql, params + params
+
+
+def random_query(length=None, level=None, start=0):
+    """Return the first matching word with a word_id of at least start."""
+    conditions, params = word_filters(length, level)
+    sql = f"""
+        SELECT word, en_translation, level, length FROM words
+        {where_clause(conditions + ["word_id >= ?"])}
+        ORDER BY word_id LIMIT 1
+        """
+    return sql, params + [start]
+
+
+class WordService:
+    """Lookup logic, independent of the HTTP layer."""
+
+    def __init__(self, pool, cache):
+        self.pool = pool
+        self.cache = cache
+
+    def lookup(self, word):
+        rows = self.pool.query(LOOKUP_SQL, (word,))
+        if not rows:
+            return {"word": word, "valid": False}
+        word, translation, level, length = rows[0]
+        return {
+            "word": word,
+            "valid": True,
+            "translation": translation,
+            "level": level,
+            "length": length,
+        }
+
+    def words(self, length=None, level=None, limit=100, after=""):
+        rows = self.pool.query(*words_query(length, level, limit, after))
+        return {
+            "words": [{"word": word, "translation": tr} for word, tr in rows],
+            "limit": limit,
+            # Pass as after= to get the next page; None on the last page
+            "next": rows[-1][0] if len(rows) == limit else None,
+        }
+
+    def random_word(self, length=None, level=None):
+        """Return a random matching word.
+
+        A random word_id in the matching range is drawn and the next matching
+        row is read by seeking to it, instead of skipping a random number of
+        rows. Words after a gap in the word_id sequence are a little more
+        likely to be picked.
+        """
+        key = ("id_range", length, level)
+        id_range = self.cache.get(key)
+        if id_range is None:
+            id_range = [
+                row[0] for row in self.pool.query(*id_range_query(length, level))
+            ]
+            self.cache.put(key, id_range)
+        low, high = id_range
+        if low is None:
+            return None
+        rows = self.pool.query(*random_query(length, level, random.randint(low, high)))
+        if not rows:
+            return None
+        word, translation, level, length = rows[0]
+        return {
+            "word": word,
+            "translation": translation,
+            "level": level,
+            "length": length,
+        }
+
+    def search(self, text, limit=20):
+        """Reverse lookup through the words_fts translation index."""
+        expression = match_expression(text)
+        if expression is None:
+            return {"words": []}
+        rows = self.pool.query(SEARCH_SQL, (expression, limit))
+        return {"words": [{"word": word, "translation": tr} for word, tr in rows]}
+
+
+def _int_param(query, name, default=None):
+    values = query.get(name)
+    if not values:
+        return default
+    return int(values[0])
+
+
+def _limit_param(query, default):
+    return max(1, min(_int_param(query, "limit", default), MAX_LIMIT))
+
+
+class WordServer:
+    def __init__(self, service):
+        self.service = service
+        self.requests = 0
+
+    async def route(self, method, target):
+        """Return (status, payload, cacheable) for a request."""
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}, False
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        query = parse_qs(parts.query)
+        run = asyncio.get_running_loop().run_in_executor
+
+        try:
+            if path == "/health":
+                return (
+                    200,
+                    {
+                        "status": "ok",
+                        "requests": self.requests,
+                        "cache": self.service.cache.stats(),
+                    },
+                    False,
+                )
+            if path.startswith("/words/") and len(path) > len("/words/"):
+                word = path[len("/words/") :]
+                return 200, await run(None, self.service.lookup, word), True
+            if path == "/words":
+                result = await run(
+                    None,
+                    self.service.words,
+                    _int_param(query, "length"),
+                    _int_param(query, "level"),
+                    _limit_param(query, 100),
+                    query.get("after", [""])[0],
+                )
+                return 200, result, True
+            if path == "/search" and query.get("q"):
+                limit = _limit_param(query, 20)
+                result = await run(None, self.service.search, query["q"][0], limit)
+                return 200, result, True
+            if path == "/random":
+                result = await run(
+                    None,
+                    self.service.random_word,
+                    _int_param(query, "length"),
+                    _int_param(query, "level"),
+                )
+                if result is None:
+                    return 404, {"error": "no matching words"}, False
+                return 200, result, False
+        except ValueError:
+            return 400, {"error": "invalid query parameter"}, False
+        except sqlite3.Error as e:
+            # e.g. /search on a database without the words_fts index
+            return 500, {"error": str(e)}, False
+        return 404, {"error": "not found"}, False
+
+    async def respond(self, method, target):
+        """Return the encoded response body, using the cache where allowed."""
+        body = self.service.cache.get(("response", target)) if method == "GET" else None
+        if body is not None:
+            return 200, body
+        status, payload, cacheable = await self.route(method, target)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        if status == 200 and cacheable:
+            self.service.cache.put(("response", target), body)
+        return status, body
+
+    @staticmethod
+    async def send(writer, status, body, keep_alive):
+        headers = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(headers.encode("latin-1"))
+        writer.write(body)
+        await writer.drain()
+
+    @staticmethod
+    async def send_error(writer, status, message):
+        """Answer a request that cannot be parsed; the connection is closed after."""
+        body = json.dumps({"error": message}).encode("utf-8")
+        await WordServer.send(writer, status, body, False)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    parts = request_line.decode("latin-1").split()
+                    if len(parts) != 3:
+                        await self.send_error(writer, 400, "malformed request line")
+                        break
+                    method, target, version = parts
+                    keep_alive = version == "HTTP/1.1"
+                    while True:
+                        header = await reader.readline()
+                        if header in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = header.decode("latin-1").partition(":")
+                        if name.strip().lower() == "connection":
+                            keep_alive = value.strip().lower() != "close"
+                except (ValueError, asyncio.LimitOverrunError):
+                    # readline raises ValueError for a line over the stream limit
+                    await self.send_error(
+                        writer, 413, "request line or header too long"
+                    )
+                    break
+
+                self.requests += 1
+                status, body = await self.respond(method, target)
+                await self.send(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def start_server(
+    db_path,
+    host="127.0.0.1",
+    port=8080,
+    pool_size=DEFAULT_POOL_SIZE,
+    cache_size=DEFAULT_CACHE_SIZE,
+    cache_ttl=DEFAULT_CACHE_TTL,
+):
+    """Start the server and return (asyncio server, WordServer)."""
+    pool = ConnectionPool(db_path, pool_size)
+    app = WordServer(WordService(pool, LRUCache(cache_size, cache_ttl)))
+    server = await asyncio.start_server(app.handle, host, port)
+    return server, app
+
+
+async def serve(db_path, host, port, pool_size, cache_size, cache_ttl):
+    server, app = await start_server(
+        db_path, host, port, pool_size, cache_size, cache_ttl
+    )
+    address = server.sockets[0].getsockname()
+    print(f"Serving {db_path} on http://{address[0]}:{address[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.service.pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve read-only word lookups over HTTP."
+    )
+    parser.add_argument("--db", default=os.path.join("es_data", "es.db"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help="Read-only SQLite connections",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="Cached responses",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help="Seconds a cached response stays valid",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(
+            serve(
+                args.db,
+                args.host,
+                args.port,
+                args.pool_size,
+                args.cache_size,
+                args.cache_ttl,
+            )
+        )
+    except KeyboardInterrupt:
+        pass